@@ -0,0 +1,46 @@
+"""Cost of branching a CryptoEnv episode as the dataset and the episode grow.
+
+Before, a planner could only branch with ``copy.deepcopy``, which copies the prices, features and history.
+``get_state``/``set_state`` only capture the episode scalars and ``clone`` shares the data and copies the
+recorded rows.
+
+    python benchmarks/bench_branching.py
+"""
+import copy
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+
+
+def best_of(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(window_size=10):
+    rng = np.random.default_rng(0)
+
+    print(f"{'ticks':>10} {'steps':>8} {'deepcopy':>12} {'clone':>12} {'get_state':>12} {'set_state':>12}   (us)")
+    for n_ticks in [10_000, 100_000, 1_000_000]:
+        df = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.001, size=n_ticks)))})
+        env = CryptoEnv(df, window_size)
+        actions = rng.integers(0, 3, n_ticks).tolist()
+        for n_steps in [100, 5_000]:
+            env.reset()
+            for action in actions[:n_steps]:
+                env.step(action)
+            state = env.get_state()
+
+            print(
+                f'{n_ticks:>10} {n_steps:>8}'
+                f' {best_of(lambda: copy.deepcopy(env), 3) * 1e6:>12.1f}'
+                f' {best_of(env.clone, 100) * 1e6:>12.1f}'
+                f' {best_of(env.get_state, 10_000) * 1e6:>12.2f}'
+                f' {best_of(lambda: env.set_state(state), 10_000) * 1e6:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
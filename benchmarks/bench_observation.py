@@ -0,0 +1,53 @@
+"""Bytes allocated per step for observations, as seen by a wrapper that needs float32 arrays.
+
+Before, observations were float64 slices that every consumer converted (and so copied) to the declared
+float32. Now they are read-only float32 views, ``copy_obs=True`` returns a copy for callers that mutate them.
+
+    python benchmarks/bench_observation.py
+"""
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.envs.CryptoEnv import Actions
+
+
+def allocated_per_step(env, get_observation, n_steps):
+    env.reset()
+    env.step(Actions.HOLD.value)
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(n_steps):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        np.asarray(get_observation(), dtype=np.float32)
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return allocated / n_steps
+
+
+def main(n_ticks=10_000, n_steps=1_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.001, size=n_ticks)))})
+
+    print(f"{'window':>8} {'float64 slice':>14} {'float32 view':>14} {'copy_obs':>14}   (bytes per step)")
+    for window_size in [10, 100, 1_000]:
+        env = CryptoEnv(df, window_size)
+        copy_env = CryptoEnv(df, window_size, copy_obs=True)
+        features64 = env.signal_features.astype(np.float64)
+
+        def float64_slice():
+            return features64[env._current_tick - window_size : env._current_tick]
+
+        print(
+            f'{window_size:>8}'
+            f' {allocated_per_step(env, float64_slice, n_steps):>14.0f}'
+            f' {allocated_per_step(env, env._get_observation, n_steps):>14.0f}'
+            f' {allocated_per_step(copy_env, copy_env._get_observation, n_steps):>14.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Step cost of a BUY after holding for an increasing number of ticks.
+
+Algorithm1.buy_reward looks at every price since the last sell, this compares the RangeIndex lookup used by
+CryptoEnv against the previous per price scan.
+
+    python benchmarks/bench_range_index.py
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.envs.CryptoEnv import Actions
+
+
+def scan_extrema(prices, start, end):
+    temp_min_price = temp_max_price = prices[start]
+    for tick in range(start, end):
+        price = prices[tick]
+        if price > temp_max_price:
+            temp_max_price = price
+        if price < temp_min_price:
+            temp_min_price = price
+    return temp_min_price, temp_max_price
+
+
+def main(n_ticks=1_100_000, window_size=10, repeat=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Close': 100 + np.cumsum(rng.normal(size=n_ticks))})
+    env = CryptoEnv(df, window_size)
+    env.reset()
+
+    print(f"{'holding':>10} {'step (us)':>12} {'scan (us)':>12}")
+    for holding in [10, 100, 1_000, 10_000, 100_000, 1_000_000]:
+        # no position, buying at ``tick`` looks back to the last sell ``holding`` ticks ago
+        tick = env._start_tick + holding
+
+        def step():
+            env._current_tick = tick - 1
+            env._last_sell_tick = env._start_tick - 1
+            env.step(Actions.BUY.value)
+            env.reset()
+
+        step_time = min(timeit.repeat(step, number=repeat, repeat=3)) / repeat
+        scan_repeat = max(repeat // holding, 1)
+        scan_time = (
+            min(timeit.repeat(lambda: scan_extrema(env.prices, tick - holding, tick + 5), number=scan_repeat, repeat=3))
+            / scan_repeat
+        )
+        print(f'{holding:>10} {step_time * 1e6:>12.2f} {scan_time * 1e6:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Worker startup time and resident memory of a process pool of CryptoEnv workers.
+
+Before, every worker got the DataFrame pickled and ran ``_process_data`` and the range index itself, so
+both grew with the worker count. With ``SharedDataset`` the data is published once and workers attach to
+it, their private (anonymous) memory stays flat and the shared block is counted once.
+
+    python benchmarks/bench_shared_memory.py
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.envs.CryptoEnv import Actions
+from gym_crypto.shared import SharedDataset, attach
+
+_env = None
+_build_time = None
+_barrier = None
+
+
+def _init_worker(barrier, make_env, *args):
+    global _env, _build_time, _barrier
+    _barrier = barrier
+    # cpu time of the worker, the wall time depends on how many workers share a core
+    start = time.process_time()
+    _env = make_env(*args)
+    # a worker can only play once the step kernel is loaded, part of its startup
+    _env.reset()
+    _env.step(Actions.HOLD.value)
+    _build_time = time.process_time() - start
+
+
+def _dataframe_env(df, window_size):
+    return CryptoEnv(df, window_size)
+
+
+def _shared_env(handle, window_size):
+    return CryptoEnv(attach(handle), window_size)
+
+
+def _worker_memory(_):
+    # read all data once, like a pass over the whole dataset would
+    _env.prices.sum()
+    _env.signal_features.sum()
+    _env._price_index.data.sum()
+    # every worker takes exactly one task
+    _barrier.wait()
+    with open('/proc/self/status') as f:
+        status = dict(line.split(':', 1) for line in f)
+    return _build_time, int(status['RssAnon'].split()[0]), int(status['RssShmem'].split()[0])
+
+
+def run_pool(n_workers, make_env, *args):
+    context = multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        n_workers, mp_context=context, initializer=_init_worker, initargs=(context.Barrier(n_workers), make_env, *args)
+    ) as pool:
+        workers = list(pool.map(_worker_memory, range(n_workers)))
+    elapsed = time.perf_counter() - start
+    build_time = sum(build_time for build_time, _, _ in workers)
+    anon = sum(anon for _, anon, _ in workers) / 1024
+    shmem = max(shmem for _, _, shmem in workers) / 1024
+    return elapsed, build_time, anon, shmem
+
+
+def main(n_ticks=2_000_000, window_size=10):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.001, size=n_ticks)))})
+
+    print(f'{n_ticks} ticks, pool startup in seconds, env build up to its first step in cpu seconds and private')
+    print('(anon) memory in MiB summed over the workers, shared memory counted once in MiB')
+    print(f"{'':>8} {'dataframe':<36}  {'shared memory':<36}")
+    print(f"{'workers':>8}" + 2 * f" {'startup':>8} {'build':>8} {'anon':>8} {'shmem':>8} ")
+    with SharedDataset.publish(df) as shared:
+        for n_workers in [1, 2, 4, 8]:
+            line = f'{n_workers:>8}'
+            for make_env, source in [(_dataframe_env, df), (_shared_env, shared.handle)]:
+                elapsed, build_time, anon, shmem = run_pool(n_workers, make_env, source, window_size)
+                line += f' {elapsed:>8.2f} {build_time:>8.3f} {anon:>8.0f} {shmem:>8.0f} '
+            print(line.rstrip())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Latency of adding one candle to a CryptoEnv as the history grows.
+
+Before, a new candle meant building a new CryptoEnv over the whole history, so the latency grew with it.
+``append_candles`` grows the buffers in place and computes the features of the new candle from the recent
+candles only.
+
+    python benchmarks/bench_streaming.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.features import FeaturePipeline
+from gym_crypto.stream import ReplayFeed
+
+
+def main(window_size=10, n_candles=1_000):
+    rng = np.random.default_rng(0)
+    pipelines = {'[Close, diff]': None, '+ RSI, MACD': FeaturePipeline([('CLOSE', {}), ('RSI', {}), ('MACD', {})])}
+
+    print(f"{'history':>10} {'features':>14} {'rebuild':>12} {'append':>12}   (us per candle)")
+    for n_history in [10_000, 100_000, 1_000_000]:
+        close = 100 * np.exp(np.cumsum(rng.normal(scale=0.001, size=n_history + n_candles)))
+        df = pd.DataFrame({'Close': close})
+        for name, pipeline in pipelines.items():
+            feed = ReplayFeed(df, start=n_history)
+
+            start = time.perf_counter()
+            for n in range(n_history + 1, n_history + 11):
+                CryptoEnv(df.iloc[:n], window_size, features=pipeline)
+            rebuild = (time.perf_counter() - start) / 10
+
+            env = CryptoEnv(feed.history(), window_size, features=pipeline)
+            batches = iter(feed)
+            # the first append copies the history into the growable buffers
+            env.append_candles(next(batches))
+            start = time.perf_counter()
+            for candles in batches:
+                env.append_candles(candles)
+            append = (time.perf_counter() - start) / (len(feed) - 1)
+
+            print(f'{n_history:>10} {name:>14} {rebuild * 1e6:>12.0f} {append * 1e6:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
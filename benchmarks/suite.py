@@ -0,0 +1,201 @@
+"""Benchmark suite of CryptoEnv on synthetic price series, with machine-readable results for regression tracking.
+
+Measures step throughput (and the share of every step phase, see ``CryptoEnv.stats``), reset latency, memory
+per env, ``max_possible_profit`` cost, step cost against holding duration and VecCryptoEnv throughput against
+the number of envs. The price series are seeded random walks, so runs on the same machine are comparable.
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --quick
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numba
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv, VecCryptoEnv
+from gym_crypto.envs.CryptoEnv import Actions
+
+SEED = 0
+
+
+def synthetic_prices(n_ticks, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.001, size=n_ticks)))})
+
+
+def random_actions(n, seed=SEED):
+    return np.random.default_rng(seed).integers(0, len(Actions), n).tolist()
+
+
+def bench_step(df, window_size, max_steps):
+    env = CryptoEnv(df, window_size)
+    n_steps = min(max_steps, env._end_tick - env._start_tick)
+    actions = random_actions(n_steps)
+    env.reset()
+    step = env.step
+    start = time.perf_counter()
+    for action in actions:
+        step(action)
+    elapsed = time.perf_counter() - start
+
+    profiled = CryptoEnv(df, window_size, profile=True)
+    profiled.reset()
+    for action in actions:
+        profiled.step(action)
+    phases = profiled.stats()['phases']
+    return dict(
+        steps_per_s=n_steps / elapsed,
+        step_us=elapsed / n_steps * 1e6,
+        phase_share={phase: phases[phase]['share'] for phase in ('kernel', 'record', 'observation')},
+    )
+
+
+def bench_reset(df, window_size, n_resets):
+    env = CryptoEnv(df, window_size)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        env.reset()
+    return dict(reset_us=(time.perf_counter() - start) / n_resets * 1e6)
+
+
+def bench_memory(df, window_size, n_envs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    envs = [CryptoEnv(df, window_size) for _ in range(n_envs)]
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del envs
+    return dict(bytes_per_env=allocated / n_envs, construct_ms=elapsed / n_envs * 1e3)
+
+
+def bench_max_possible_profit(df, window_size, fees, n_calls):
+    env = CryptoEnv(df, window_size)
+    start = time.perf_counter()
+    env.max_possible_profit(fees=fees)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        env.max_possible_profit(fees=fees)
+    cached = (time.perf_counter() - start) / n_calls
+    return dict(cold_ms=cold * 1e3, cached_us=cached * 1e6)
+
+
+def bench_holding(df, window_size, holding, n_trades):
+    # BUY, hold for ``holding`` ticks, SELL: the reward of the SELL looks at the prices of the whole holding
+    env = CryptoEnv(df, window_size, record='off')
+    cycle = [Actions.BUY.value] + [Actions.HOLD.value] * holding + [Actions.SELL.value]
+    n_trades = min(n_trades, (env._end_tick - env._start_tick) // len(cycle))
+    env.reset()
+    step = env.step
+    start = time.perf_counter()
+    for _ in range(n_trades):
+        for action in cycle:
+            step(action)
+    elapsed = time.perf_counter() - start
+    return dict(step_us=elapsed / (n_trades * len(cycle)) * 1e6)
+
+
+def bench_vector(df, window_size, num_envs, n_steps):
+    env = VecCryptoEnv(df, window_size, num_envs)
+    actions = np.random.default_rng(SEED).integers(0, len(Actions), (n_steps, num_envs))
+    env.reset()
+    env.step(actions[0])
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    return dict(env_steps_per_s=n_steps * num_envs / elapsed, step_us=elapsed / n_steps * 1e6)
+
+
+def warm_up():
+    # compiles the kernels, so timings do not include numba compilation
+    df = synthetic_prices(1_000)
+    env = CryptoEnv(df, 10)
+    env.reset()
+    for action in random_actions(100):
+        env.step(action)
+    env.max_possible_profit()
+    env.max_possible_profit(fees=True)
+    vector = VecCryptoEnv(df, 10, 2)
+    vector.reset()
+    vector.step(np.zeros(2, dtype=np.int64))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(quick=False):
+    lengths = [10_000, 100_000] if quick else [10_000, 100_000, 1_000_000]
+    window_sizes = [10, 100] if quick else [10, 100, 1_000]
+    scale = 10 if quick else 1
+    results = []
+
+    def record(benchmark, params, metrics):
+        results.append(dict(benchmark=benchmark, params=params, metrics=metrics))
+        print(benchmark, params, {key: value for key, value in metrics.items() if not isinstance(value, dict)})
+
+    warm_up()
+    for n_ticks in lengths:
+        df = synthetic_prices(n_ticks)
+        for window_size in window_sizes:
+            params = dict(n_ticks=n_ticks, window_size=window_size)
+            record('step', params, bench_step(df, window_size, 50_000 // scale))
+            record('reset', params, bench_reset(df, window_size, 1_000 // scale))
+        for n_envs in [1, 8] if quick else [1, 8, 32]:
+            record('memory', dict(n_ticks=n_ticks, window_size=10, n_envs=n_envs), bench_memory(df, 10, n_envs))
+        for fees in [False, True]:
+            params = dict(n_ticks=n_ticks, window_size=10, fees=fees)
+            record('max_possible_profit', params, bench_max_possible_profit(df, 10, fees, 1_000 // scale))
+
+    df = synthetic_prices(lengths[-1])
+    for holding in [10, 1_000, 10_000 if quick else 100_000]:
+        params = dict(n_ticks=lengths[-1], window_size=10, holding=holding)
+        record('holding', params, bench_holding(df, 10, holding, 100 // scale))
+    for num_envs in [1, 16, 256]:
+        params = dict(n_ticks=lengths[-1], window_size=10, num_envs=num_envs)
+        record('vector', params, bench_vector(df, 10, num_envs, 10_000 // scale))
+
+    return dict(
+        meta=dict(
+            created=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            commit=git_commit(),
+            quick=quick,
+            seed=SEED,
+            python=sys.version.split()[0],
+            numpy=np.__version__,
+            pandas=pd.__version__,
+            numba=numba.__version__,
+            platform=platform.platform(),
+            processor=platform.processor(),
+        ),
+        results=results,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='smaller datasets and fewer repetitions')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run(quick=args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
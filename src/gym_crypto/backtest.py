@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs.CryptoEnv import CryptoEnv
+
+
+def backtest(prices, actions, window_size, reward_algo='algorithm1'):
+    """Score one (1D) or many (2D, one per row) action sequences on ``prices`` with CryptoEnv's default settings.
+
+    See ``CryptoEnv.evaluate``, use it directly to backtest with changed fees or reward settings.
+    """
+    env = CryptoEnv(
+        pd.DataFrame({'Close': np.asarray(prices, dtype=np.float64)}),
+        window_size,
+        reward_algo=reward_algo,
+        record='off',
+    )
+    return env.evaluate(actions)
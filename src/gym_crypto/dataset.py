@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import shutil
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.features import FeaturePipeline, atomic_save_npy
+from gym_crypto.range_index import RangeIndex
+
+# signal features of CryptoEnv when no pipeline is given
+DEFAULT_FEATURES = [('CLOSE', {}), ('DIFF', {})]
+
+
+def features_cache_name(pipeline):
+    return f'features-{pipeline.config_key()}'
+
+
+class CandleDataset:
+    """Columnar candle data that CryptoEnv can use in place of a DataFrame without loading it in memory.
+
+    ``source`` is a directory written by ``CandleDataset.write`` with one ``.npy`` file per column, or a mapping
+    of column name to array (e.g. ``np.memmap``). Directory columns are opened memory-mapped, so only the pages
+    that are read (the windows an episode visits) are loaded and processes share them through the page cache.
+
+    Feature matrices and the price range index are computed once and stored under ``<directory>/cache/<data_key>``,
+    later envs open them memory-mapped, so env startup does not depend on the dataset size. ``data_key`` is a
+    hash of the data written to ``meta.json`` by ``write``, cache files of other data are never used. Mapping
+    sources have no directory and keep them in memory instead.
+    """
+
+    def __init__(self, source):
+        self.path = None
+        self.data_key = None
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                meta = json.load(f)
+            files = {column: os.path.join(self.path, f'{column}.npy') for column in meta['columns']}
+            self._columns = {column: np.load(file, mmap_mode='r') for column, file in files.items()}
+            # directories written before data_key existed are identified by the size and mtime of their files
+            self.data_key = meta.get('data_key') or _hash_file_stats(files.values())
+        else:
+            self._columns = dict(source)
+
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) != 1:
+            raise ValueError(f'columns differ in length: {sorted(lengths)}')
+        self._length = lengths.pop()
+        self._cache = {}
+
+    @classmethod
+    def write(cls, path, df):
+        """Store the columns of DataFrame ``df`` in directory ``path`` and open it.
+
+        Replaces the data and the cache of an existing dataset in ``path``. Columns have to be numbers or dates,
+        dates stored as text (e.g. read by ``pd.read_csv``) are parsed and stored as UTC ``datetime64``.
+        """
+        os.makedirs(path, exist_ok=True)
+        shutil.rmtree(os.path.join(path, 'cache'), ignore_errors=True)
+        digest = hashlib.blake2b(digest_size=20)
+        for column in df.columns:
+            values = _storable(column, df[column])
+            np.save(os.path.join(path, f'{column}.npy'), values)
+            digest.update(str(column).encode())
+            digest.update(str(values.dtype).encode())
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(dict(columns=[str(column) for column in df.columns], data_key=digest.hexdigest()), f)
+        return cls(path)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, column):
+        return self._columns[column]
+
+    def _cached(self, name, compute, valid):
+        # a stored array that is not ``valid`` for this data (e.g. a partly copied directory) is computed again
+        if name not in self._cache:
+            if self.path is None:
+                self._cache[name] = compute()
+            else:
+                path = os.path.join(self.path, 'cache', self.data_key, f'{name}.npy')
+                if not os.path.exists(path) or not valid(np.load(path, mmap_mode='r')):
+                    atomic_save_npy(path, compute())
+                self._cache[name] = np.load(path, mmap_mode='r')
+        return self._cache[name]
+
+    def features(self, pipeline=None):
+        """The float32 feature matrix of ``pipeline``, ``[Close, diff]`` when not given."""
+        pipeline = FeaturePipeline(DEFAULT_FEATURES) if pipeline is None else pipeline
+        return self._cached(
+            features_cache_name(pipeline), lambda: pipeline.transform(self), lambda features: len(features) == len(self)
+        )
+
+    def range_index(self, column):
+        """``RangeIndex`` over a whole column."""
+        data = self._cached(
+            f'range-index-{column}',
+            lambda: RangeIndex(self[column]).data,
+            lambda data: RangeIndex.from_data(data).n == len(self),
+        )
+        return RangeIndex.from_data(data)
+
+
+def _storable(name, column):
+    # np.load can only memory-map fixed size values, not the Python objects of text columns
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy()
+    try:
+        with warnings.catch_warnings():
+            # pandas warns when it can not infer a date format, text that is not a date raises after it anyway
+            warnings.simplefilter('ignore', UserWarning)
+            return pd.to_datetime(column, utc=True).dt.tz_localize(None).to_numpy()
+    except (ValueError, TypeError):
+        raise ValueError(f'column {name!r} of {column.dtype} can not be stored, use numbers or dates') from None
+
+
+def _hash_file_stats(paths):
+    digest = hashlib.blake2b(digest_size=20)
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()
@@ -1,6 +1,20 @@
+import copy
+import sys
 import numpy as np
+from collections import namedtuple
 from enum import Enum
 import gym
+from gym import spaces
+from numpy.lib.stride_tricks import sliding_window_view
+
+from gym_crypto.dataset import DEFAULT_FEATURES, CandleDataset
+from gym_crypto.features import FeaturePipeline
+from gym_crypto.profiling import Profiler
+from gym_crypto.kernels import get_step_kernels, max_profit_fees_kernel, max_profit_kernel
+from gym_crypto.range_index import RangeIndex
+from gym_crypto.recorder import EpisodeRecorder
+from gym_crypto.rendering import EpisodeRenderer, decimate_markers, decimate_minmax, pyplot
+from gym_crypto.rewards import get_reward
 
 class Actions(Enum):
     BUY = 0
@@ -14,16 +28,51 @@ class Positions(Enum):
     def opposite(self):
         return Positions.NO if self == Positions.YES else Positions.YES
 
+# the mutable part of a CryptoEnv episode, see CryptoEnv.get_state
+EnvState = namedtuple(
+    'EnvState',
+    [
+        'current_tick',
+        'done',
+        'position',
+        'action',
+        'last_trade_tick',
+        'last_buy_tick',
+        'last_sell_tick',
+        'total_reward',
+        'total_profit',
+        'history_length',
+    ],
+)
+
 class CryptoEnv(gym.Env):
-    metadata = {'render.modes': ['human']}
+    metadata = {'render.modes': ['human', 'rgb_array']}
 
-    def __init__(self, df, window_size):
+    def __init__(
+        self, df, window_size, reward_algo='algorithm1', copy_obs=False, features=None, record='full', profile=False
+    ):
+        # DataFrame or gym_crypto.dataset.CandleDataset
         self.df = df
         self.window_size = window_size
-        self.prices, self.signal_features = self._process_data()
-        self.shape = (window_size, self.signal_features.shape[1])
-
         self.frame_bound = [window_size, len(df)]
+        # gym_crypto.features.FeaturePipeline computing signal_features, [Close, diff] when not given
+        self.features = features
+        # observations are read-only views into signal_features unless copy_obs is set
+        self.copy_obs = copy_obs
+
+        self.prices, signal_features = self._process_data()
+        self.signal_features = np.ascontiguousarray(signal_features, dtype=np.float32)
+        self._price_index = None
+        if isinstance(self.df, CandleDataset) and len(self.prices) == len(self.df):
+            # stored with the dataset, building it would read every price
+            self._price_index = self.df.range_index('Close')
+            if self._price_index.n != len(self.prices):
+                self._price_index = None
+        if self._price_index is None:
+            self._price_index = RangeIndex(self.prices)
+        self.shape = (window_size, self.signal_features.shape[1])
+        # observation of tick t is _observations[t - window_size], signal_features[t - window_size : t]
+        self._observations = sliding_window_view(self.signal_features, window_size, axis=0).transpose(0, 2, 1)
 
         # spaces
         self.action_space = spaces.Discrete(len(Actions))
@@ -38,13 +87,18 @@ class CryptoEnv(gym.Env):
         self._last_sell_tick = None
         self._last_buy_tick = None
         self._position = None
-        self._position_history = None
         self._action = None
-        self._action_history = None
         self._total_reward = None
         self._total_profit = None
         self._first_rendering = None
-        self.history = None
+        # created by the first render, see gym_crypto.rendering
+        self._renderer = None
+        # recorder rows whose trade markers were given to the renderer
+        self._rendered_rows = 0
+        # actions, positions, rewards and profit per tick, 'off', 'summary' or 'full' (see gym_crypto.recorder)
+        self.recorder = EpisodeRecorder(self._start_tick, self._end_tick, record)
+        # per phase timings and counters, see stats
+        self.profiler = Profiler() if profile else None
 
         self.trade_fee_bid_percent = 0.075  # percentage
         self.trade_fee_ask_percent = 0.075  # percentage
@@ -55,33 +109,128 @@ class CryptoEnv(gym.Env):
         self._profitable_sell_reward = 1
         self._non_profitable_sell_punishment = -self._profitable_sell_reward
 
-        self.reward_algo = Algorithm1
-        self.reward_history = []
+        # compiled reward function or the name it is registered under, see gym_crypto.rewards
+        self.reward_algo = get_reward(reward_algo)
+        self._step_kernel, _, self._episode_kernel = get_step_kernels(self.reward_algo)
+        self._reward_params = None
+
+        # max_possible_profit/oracle_trades results per tick range and fees, appending candles keeps them valid
+        self._oracle_cache = {}
+        # growable buffers of append_candles, created on the first append
+        self._stream = None
 
     def _process_data(self):
-        prices = self.df.loc[:, 'Close'].to_numpy()
+        if isinstance(self.df, CandleDataset):
+            # memory-mapped, slicing only creates views
+            prices = self.df['Close']
+        else:
+            prices = self.df.loc[:, 'Close'].to_numpy()
 
         prices[self.frame_bound[0] - self.window_size]  # validate index (TODO: Improve validation)
-        prices = prices[self.frame_bound[0] - self.window_size : self.frame_bound[1]]
+        frame = slice(self.frame_bound[0] - self.window_size, self.frame_bound[1])
+        prices = prices[frame]
 
-        diff = np.insert(np.diff(prices), 0, 0)
-        signal_features = np.column_stack((prices, diff))
+        if isinstance(self.df, CandleDataset):
+            return prices, self.df.features(self.features)[frame]
 
-        return prices, signal_features
+        if self.features is not None:
+            return prices, self.features.transform(self.df)[frame]
 
-    def _calculate_reward(self, action):
-        step_reward = 0
+        signal_features = np.empty((len(prices), 2), dtype=np.float32)
+        signal_features[:, 0] = prices
+        signal_features[0, 1] = 0
+        signal_features[1:, 1] = np.diff(prices)
 
-        if action == Actions.BUY.value:
-            step_reward = self.reward_algo.buy_reward(self)
-        elif action == Actions.SELL.value:
-            step_reward = self.reward_algo.sell_reward(self)
-        elif action == Actions.HOLD.value:
-            step_reward = self.reward_algo.hold_reward(self)
+        return prices, signal_features
+
+    def append_candles(self, candles):
+        """Add candles after the last one, e.g. live candles or the batches of a ``gym_crypto.stream.ReplayFeed``.
+
+        ``candles`` is a DataFrame or a mapping of column arrays with ``Close`` and the columns the features are
+        computed from. Prices, signal features and the price index grow in place, amortised constant time per
+        candle whatever the history length, and the features of the new candles are computed from the recent
+        candles only (see ``FeaturePipeline.transform_tail``). ``_end_tick`` moves to the new last candle, so an
+        episode that is not done keeps stepping into them. ``df`` is not changed.
+        """
+        columns = {str(column).lower(): column for column in candles}
+        # before copying the data into the stream buffers, an empty batch does not need them
+        if 'close' in columns and not len(candles[columns['close']]):
+            return
+        if self.profiler is not None:
+            self.profiler.start()
+        if self._stream is None or self._stream[2] is None:
+            self._start_stream()
+        pipeline, tails, features = self._stream
+
+        missing = [name for name in tails if name not in columns]
+        if missing:
+            raise KeyError(f'candles have no columns for {missing}')
+        new = {name: np.asarray(candles[columns[name]], dtype=np.float64) for name in tails}
+        n_new = len(new['close'])
+
+        history = pipeline.tail_rows(0)
+        for name, values in new.items():
+            tails[name] = np.concatenate([tails[name], values])
+        new_features = pipeline.transform_tail(CandleDataset(tails), n_new)
+        for name, values in tails.items():
+            tails[name] = values[len(values) - history :]
+
+        n = len(self.prices) + n_new
+        if n > len(features):
+            features = self._grow_features(2 * n)
+        features[len(self.prices) : n] = new_features
+        self.signal_features = features[:n]
+
+        self._price_index.append(new['close'])
+        self.prices = self._price_index.values
+        self.frame_bound[1] = n
+        self._end_tick = n - 1
+        self.recorder.reserve(self._end_tick)
+        if self.profiler is not None:
+            self.profiler.mark('append')
+
+    def _start_stream(self):
+        # copies the data into buffers owned by this env, the current arrays may be read-only or shared
+        if self._stream is None:
+            pipeline = self.features if self.features is not None else FeaturePipeline(DEFAULT_FEATURES)
+            history = pipeline.tail_rows(0)
+            tails = {
+                name: np.array(values[len(values) - history :])
+                for name, values in pipeline.input_arrays(self.df).items()
+            }
+            if 'close' not in tails:
+                tails['close'] = np.array(self.prices[len(self.prices) - history :])
+        else:
+            # clone of an env that appended candles, df does not have them but the tails copied by clone do
+            pipeline, tails, _ = self._stream
+
+        self._stream = pipeline, tails, None
+        self._grow_features(2 * len(self.prices))
+        self._price_index = RangeIndex(self.prices, capacity=2 * len(self.prices))
+
+    def _grow_features(self, capacity):
+        features = np.empty((capacity, self.signal_features.shape[1]), dtype=np.float32)
+        features[: len(self.signal_features)] = self.signal_features
+        self._stream = self._stream[:2] + (features,)
+        # windows over the whole buffer, the ones past the last candle are never returned
+        self._observations = sliding_window_view(features, self.window_size, axis=0).transpose(0, 2, 1)
+        return features
+
+    def _get_reward_params(self):
+        return np.array(
+            [
+                self._look_ahead_range,
+                self._profitable_sell_threshold,
+                self._profitable_sell_reward,
+                self._non_profitable_sell_punishment,
+            ],
+            dtype=np.float64,
+        )
 
-        return step_reward
-    
     def step(self, action):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
         self._action = action
         self._done = False
         self._current_tick += 1
@@ -89,134 +238,275 @@ class CryptoEnv(gym.Env):
         if self._current_tick == self._end_tick:
             self._done = True
 
-        step_reward = self._calculate_reward(self._action)
+        if profiler is not None:
+            n_overloads = len(self._step_kernel.overloads)
+        # reward, profit update and position flip in one compiled call
+        (
+            step_reward,
+            position,
+            self._last_trade_tick,
+            self._last_buy_tick,
+            self._last_sell_tick,
+            self._total_profit,
+        ) = self._step_kernel(
+            self._action,
+            self._done,
+            self._position.value,
+            self._current_tick,
+            self._last_trade_tick,
+            self._last_buy_tick,
+            self._last_sell_tick,
+            self._total_profit,
+            self.prices,
+            self._price_index.data,
+            self._reward_params,
+            self.trade_fee_bid_percent,
+            self.trade_fee_ask_percent,
+        )
+        if profiler is not None:
+            # the first call for new argument types loads or compiles the kernel, which would swamp the kernel time
+            profiler.mark('kernel' if len(self._step_kernel.overloads) == n_overloads else 'compile')
+            if self._last_trade_tick == self._current_tick:
+                profiler.count('trades')
         self._total_reward += step_reward
-
-        self._update_profit(self._action)
-
-        trade = False
-        if (self._action == Actions.BUY.value and self._position == Positions.NO) or (
-            self._action == Actions.SELL.value and self._position == Positions.YES
-        ):
-            trade = True
-
-        if trade:
-            self._position = self._position.opposite()
-            self._last_trade_tick = self._current_tick
-
-            if self._action == Actions.BUY.value:
-                self._last_buy_tick = self._current_tick
-            else:
-                self._last_sell_tick = self._current_tick
-
-        self._position_history.append(self._position)
-        self._action_history.append(self._action)
+        self._position = Positions.YES if position == Positions.YES.value else Positions.NO
+        self.recorder.record(action, position, step_reward, self._total_reward, self._total_profit)
+        if profiler is not None:
+            profiler.mark('record')
 
         observation = self._get_observation()
-        info = dict(step_reward=step_reward, total_reward=self._total_reward, total_profit=self._total_profit, position=self._position.value)
-        self._update_history(info)
+        info = dict(
+            step_reward=step_reward, total_reward=self._total_reward, total_profit=self._total_profit, position=position
+        )
+        if profiler is not None:
+            profiler.mark('observation')
 
         return observation, step_reward, self._done, info
 
-    def _update_profit(self, action):
-        if (action == Actions.SELL.value and self._position == Positions.YES) or self._done:
-            current_price = self.prices[self._current_tick]
-            last_buy_price = self.prices[self._last_buy_tick]
-
-            if self._position == Positions.YES and self._done:
-                shares = (self._total_profit * (1 - self.trade_fee_ask_percent)) / last_buy_price
-                self._total_profit = (shares * (1 - self.trade_fee_bid_percent)) * current_price
-
-    def max_possible_profit(self):
-        current_tick = self._start_tick
-        last_trade_tick = current_tick - 1
-        profit = 1.0
-
-        while current_tick <= self._end_tick:
-            position = None
-            if self.prices[current_tick] < self.prices[current_tick - 1]:
-                while current_tick <= self._end_tick and self.prices[current_tick] < self.prices[current_tick - 1]:
-                    current_tick += 1
-                position = Positions.NO
+    def evaluate(self, actions):
+        """Play ``actions`` from the start of an episode in one compiled pass.
+
+        Gives the same rewards and profit as ``reset`` followed by ``step`` for every action, without building
+        observations or history. The env state is left untouched. ``actions`` may also be 2D, one episode per
+        row, to score many action sequences at once.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        single = actions.ndim == 1
+        actions = np.atleast_2d(actions)
+        if actions.shape[1] > self._end_tick - self._start_tick:
+            raise ValueError(
+                f'got {actions.shape[1]} actions, an episode has {self._end_tick - self._start_tick} steps'
+            )
+
+        rewards, positions, trades, total_reward, total_profit = self._episode_kernel(
+            actions,
+            self._start_tick,
+            self._end_tick,
+            self.prices,
+            self._price_index.data,
+            self._get_reward_params(),
+            self.trade_fee_bid_percent,
+            self.trade_fee_ask_percent,
+        )
+        ticks = np.arange(self._start_tick + 1, self._start_tick + 1 + actions.shape[1])
+        trade_ticks = [ticks[episode_trades] for episode_trades in trades]
+
+        if single:
+            return dict(
+                rewards=rewards[0],
+                positions=positions[0],
+                trade_ticks=trade_ticks[0],
+                total_reward=total_reward[0],
+                total_profit=total_profit[0],
+            )
+        return dict(
+            rewards=rewards,
+            positions=positions,
+            trade_ticks=trade_ticks,
+            total_reward=total_reward,
+            total_profit=total_profit,
+        )
+
+    def max_possible_profit(self, start_tick=None, end_tick=None, fees=False):
+        return self.oracle_trades(start_tick, end_tick, fees)[0]
+
+    def oracle_trades(self, start_tick=None, end_tick=None, fees=False):
+        """Return ``(profit, buy_ticks, sell_ticks)`` of the best possible trades between two ticks.
+
+        Defaults to the episode ticks. Without fees every rising run of prices is traded, with ``fees`` the
+        trade fees are applied and runs are merged when that pays more. Results are cached per tick range, the
+        tick arrays are read-only.
+        """
+        start_tick = self._start_tick if start_tick is None else start_tick
+        end_tick = self._end_tick if end_tick is None else end_tick
+        if not 1 <= start_tick <= end_tick < len(self.prices):
+            raise ValueError(f'invalid tick range [{start_tick}, {end_tick}] for {len(self.prices)} prices')
+
+        if self.profiler is not None:
+            self.profiler.start()
+        key = (start_tick, end_tick, (self.trade_fee_bid_percent, self.trade_fee_ask_percent) if fees else None)
+        if key in self._oracle_cache:
+            if self.profiler is not None:
+                self.profiler.count('oracle_hits')
+        else:
+            if fees:
+                result = max_profit_fees_kernel(
+                    self.prices, start_tick, end_tick, self.trade_fee_bid_percent, self.trade_fee_ask_percent
+                )
             else:
-                while current_tick <= self._end_tick and self.prices[current_tick] >= self.prices[current_tick - 1]:
-                    current_tick += 1
-                position = Positions.YES
-
-            if position == Positions.YES:
-                current_price = self.prices[current_tick - 1]
-                last_trade_price = self.prices[last_trade_tick]
-                shares = profit / last_trade_price
-                profit = shares * current_price
-            last_trade_tick = current_tick - 1
-
-        return profit
-    
+                result = max_profit_kernel(self.prices, start_tick, end_tick)
+            # every later call returns the same arrays
+            for ticks in result[1:]:
+                ticks.flags.writeable = False
+            self._oracle_cache[key] = result
+        if self.profiler is not None:
+            self.profiler.mark('oracle')
+        return self._oracle_cache[key]
+
     def reset(self):
+        if self.profiler is not None:
+            self.profiler.start()
         self._done = False
         self._current_tick = self._start_tick
         self._last_trade_tick = self._current_tick - 1
         self._last_sell_tick = self._current_tick - 1
         self._last_buy_tick = self._current_tick - 1
         self._position = Positions.NO
-        self._position_history = (self.window_size * [None]) + [self._position]
         self._action = Actions.HOLD
-        self._action_history = (self.window_size * [None]) + [self._action]
         self._total_reward = 0.0
         self._total_profit = 1.0  # unit
         self._first_rendering = True
-        self.history = {}
-        return self._get_observation()
+        self.recorder.reset(self._action.value, self._position.value)
+        self._reward_params = self._get_reward_params()
+        observation = self._get_observation()
+        if self.profiler is not None:
+            self.profiler.mark('reset')
+            self.profiler.count('episodes')
+        return observation
+
+    def stats(self):
+        """Timings and counters of the env phases since it was created, see ``gym_crypto.profiling.Profiler``."""
+        if self.profiler is None:
+            raise ValueError('profiling is off, create the env with profile=True')
+        return self.profiler.stats()
     
-    def _get_observation(self):
-        return self.signal_features[(self._current_tick - self.window_size) : self._current_tick]
+    def get_state(self):
+        """Snapshot of the episode state to return to with ``set_state``, e.g. to branch in a tree search.
+
+        Only the ticks, position, action, totals and the recorder cursor are captured, a snapshot costs the same
+        whatever the dataset size or episode length.
+        """
+        return EnvState(
+            self._current_tick,
+            self._done,
+            self._position,
+            self._action,
+            self._last_trade_tick,
+            self._last_buy_tick,
+            self._last_sell_tick,
+            self._total_reward,
+            self._total_profit,
+            self.recorder.length,
+        )
+
+    def set_state(self, state):
+        """Continue the episode from a ``get_state`` snapshot of this env (or of a ``clone`` of it).
+
+        The recorder is only rewound, its rows are not restored: returning to an earlier state of the current path
+        is exact, but stepping another path from an earlier state overwrites the rows of the snapshot's path. Use
+        ``clone`` when branches need their own history.
+        """
+        (
+            self._current_tick,
+            self._done,
+            self._position,
+            self._action,
+            self._last_trade_tick,
+            self._last_buy_tick,
+            self._last_sell_tick,
+            self._total_reward,
+            self._total_profit,
+            self.recorder.length,
+        ) = state
+        # the markers drawn so far may be of another path
+        self._first_rendering = True
+
+    def clone(self):
+        """Independent copy of the env in the same state, sharing the price and feature data with this env.
+
+        Copies the recorded rows of the episode, ``get_state``/``set_state`` on a single env avoid even that.
+        """
+        env = copy.copy(self)
+        env.recorder = self.recorder.copy()
+        # appending to the clone copies the data first instead of growing the buffers of this env
+        env._stream = None
+        if self._stream is not None:
+            pipeline, tails, _ = self._stream
+            env._stream = pipeline, {name: values.copy() for name, values in tails.items()}, None
+        # results stay valid while both append the same candles, but clone and env may append different ones
+        env._oracle_cache = dict(self._oracle_cache)
+
+        # the clone renders into its own figure
+        env._renderer = None
+        env.profiler = None if self.profiler is None else Profiler()
+        env.frame_bound = list(self.frame_bound)
+        return env
 
-    def _update_history(self, info):
-        if not self.history:
-            self.history = {key: [] for key in info.keys()}
+    def _get_observation(self):
+        observation = self._observations[self._current_tick - self.window_size]
+        return observation.copy() if self.copy_obs else observation
 
-        for key, value in info.items():
-            self.history[key].append(value)
+    @property
+    def history(self):
+        """The recorded episode as a DataFrame indexed by tick, see ``EpisodeRecorder.to_dataframe``."""
+        return self.recorder.to_dataframe()
 
     def render(self, mode='human'):
-        def _plot_position(action, tick):
-            color = None
-            if action == Actions.BUY:
-                color = 'green'
-            elif action == Actions.HOLD:
-                color = 'blue'
-            elif action == Actions.SELL:
-                color = 'red'
-            if color:
-                plt.scatter(tick, self.prices[tick], color=color)
+        """Draw the prices with the trades so far and the current action.
+
+        ``'human'`` updates a pyplot window, ``'rgb_array'`` draws headless and returns the frame as an
+        ``(height, width, 3)`` uint8 array. Only the markers and title are redrawn on every call.
+        """
+        if mode not in self.metadata['render.modes']:
+            raise ValueError(f'unknown render mode {mode!r}, use one of {self.metadata["render.modes"]}')
+        if self._renderer is None or self._renderer.mode != mode:
+            if self._renderer is not None:
+                self._renderer.close()
+            self._renderer = EpisodeRenderer(mode)
+            self._first_rendering = True
 
         if self._first_rendering:
             self._first_rendering = False
-            plt.cla()
-            plt.plot(self.prices)
-            start_action = self._action_history[self._start_tick]
-            _plot_position(start_action, self._start_tick)
-
-        _plot_position(self._action, self._current_tick)
-
-        plt.suptitle("Total Reward: %.6f" % self._total_reward + ' ~ ' + "Total Profit: %.6f" % self._total_profit)
-
-        plt.pause(0.01)
+            self._renderer.start(self.prices)
+            self._rendered_rows = 0
+
+        # trades recorded since the last frame, HOLD markers on every tick would hide the price line. The last
+        # row is the current action, drawn by update.
+        if 'action' in self.recorder.columns:
+            rows = slice(self._rendered_rows, self.recorder.length - 1)
+            actions = self.recorder.action[rows]
+            ticks = self.recorder.start_tick + np.arange(rows.start, rows.stop)
+            trades = actions != Actions.HOLD.value
+            self._renderer.add_markers(ticks[trades], self.prices[ticks[trades]], actions[trades])
+            self._rendered_rows = rows.stop
+        action = self._action.value if isinstance(self._action, Actions) else self._action
+
+        title = "Total Reward: %.6f" % self._total_reward + ' ~ ' + "Total Profit: %.6f" % self._total_profit
+        return self._renderer.update(self._current_tick, self.prices[self._current_tick], action, title)
 
     def render_all(self):
-        window_ticks = np.arange(len(self._action_history))
-        plt.plot(self.prices)
-
-        hold_ticks = []
-        sell_ticks = []
-        buy_ticks = []
-        for i, tick in enumerate(window_ticks):
-            if self._action_history[i] == Actions.BUY:
-                buy_ticks.append(tick)
-            elif self._action_history[i] == Actions.HOLD:
-                hold_ticks.append(tick)
-            elif self._action_history[i] == Actions.SELL:
-                sell_ticks.append(tick)
+        plt = pyplot()
+        width = int(plt.gcf().get_figwidth() * plt.gcf().dpi)
+        # one marker per action and pixel column, like the live view
+        ticks = self.recorder.ticks
+        actions = self.recorder.action
+        keep = decimate_markers(ticks, actions, max(-(-len(self.prices) // width), 1))
+        ticks, actions = ticks[keep], actions[keep]
+        plt.plot(*decimate_minmax(self.prices, width))
+
+        buy_ticks = ticks[actions == Actions.BUY.value]
+        hold_ticks = ticks[actions == Actions.HOLD.value]
+        sell_ticks = ticks[actions == Actions.SELL.value]
 
         plt.plot(buy_ticks, self.prices[buy_ticks], 'ro')
         plt.plot(hold_ticks, self.prices[hold_ticks], 'bo')
@@ -225,122 +515,15 @@ class CryptoEnv(gym.Env):
         plt.suptitle("Total Reward: %.6f" % self._total_reward + ' ~ ' + "Total Profit: %.6f" % self._total_profit)
 
     def close(self):
-        plt.close()
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
+        # without importing pyplot when nothing was plotted
+        if 'matplotlib.pyplot' in sys.modules:
+            pyplot().close()
 
     def save_rendering(self, filepath):
-        plt.savefig(filepath)
+        pyplot().savefig(filepath)
 
     def pause_rendering(self):
-        plt.show()
-
-class Algorithm1:
-    def buy_reward(env):
-        step_reward = 0
-
-        current_price = env.prices[env._current_tick]
-        # last_trade_price = env.prices[env._last_trade_tick]
-        last_buy_price = env.prices[env._last_buy_tick]
-        env.prices[env._last_sell_tick]
-
-        if env._position == Positions.NO:
-            temp_max_price = current_price
-            temp_min_price = current_price
-
-            for tick in range(env._last_sell_tick, env._current_tick + env._look_ahead_range):
-                price = env.prices[tick]
-
-                if price > current_price:
-                    # good
-                    if price > temp_max_price:
-                        temp_max_price = price
-
-                if price < current_price:
-                    # bad, means this buy is sub-optimal
-                    if price < temp_min_price:
-                        temp_min_price = price
-
-            if current_price > temp_min_price:
-                # punishment for buying too high
-                step_reward += ((temp_min_price - current_price) / current_price) * 100
-
-            if current_price < temp_max_price:
-                # reward for buying at low point
-                # increase to prevent piramidding
-                step_reward += ((temp_max_price - current_price) / current_price) * 100
-
-        else:
-            # will be negative if this price is higher than the previous price and positive if reverse
-            step_reward += ((last_buy_price - current_price) / current_price) * 100
-
-        return step_reward
-
-    def sell_reward(env):
-        step_reward = 0
-
-        current_price = env.prices[env._current_tick]
-        last_buy_price = env.prices[env._last_buy_tick]
-        last_sell_price = env.prices[env._last_sell_tick]
-
-        # profit/loss reward/punishment
-        if env._position == Positions.YES:
-
-            # perhaps don't do this, a non-profitable sell could still be good if it saves you from further loss like in a downtrend
-            # hard to tell whether it is a downtrend or not tho...
-            if last_buy_price * (1 + (env._profitable_sell_threshold / 100)) >= current_price:
-                step_reward += env._profitable_sell_reward
-            else:
-                step_reward += env._non_profitable_sell_punishment
-
-            temp_max_price = current_price
-            temp_min_price = current_price
-
-            for tick in range(env._last_buy_tick, env._current_tick + env._look_ahead_range):
-                price = env.prices[tick]
-
-                if price > current_price:
-                    if price > temp_max_price:
-                        temp_max_price = price
-
-                if price < current_price:
-                    if price < temp_min_price:
-                        temp_min_price = price
-
-            if current_price < temp_max_price:
-                # punishment for selling too low
-                step_reward += ((current_price - temp_max_price) / temp_max_price) * 100
-
-            if current_price > temp_min_price:
-                # reward for selling above lowest point
-                step_reward += ((current_price - temp_min_price) / temp_min_price) * 100
-
-        else:
-            # scenario 1
-            # Sell after another sell that was at a higher price, bad sell
-            # scenario 2
-            # Sell after another sell that was at a lower price, good sell
-            step_reward += ((current_price - last_sell_price) / last_sell_price) * 100
-
-        return step_reward
-
-    def hold_reward(env):
-        step_reward = 0
-
-        current_price = env.prices[env._current_tick]
-        previous_price = env.prices[env._current_tick - 1]
-        next_price = env.prices[env._current_tick + 1]
-
-        # if Position, price is higher than previouse and lower than next (i.e. a rising price)
-        if env._position == Positions.YES and previous_price <= current_price and next_price >= current_price:
-            step_reward += ((next_price - previous_price) / previous_price) * 100
-        # if Position, price is lower than previouse and higher than next (i.e. a dropping price)
-        elif env._position == Positions.YES and previous_price >= current_price and next_price <= current_price:
-            step_reward += ((previous_price - next_price) / next_price) * 100
-
-        # if NO Position, price is higher than previouse and lower than next (i.e. a rising price)
-        elif env._position == Positions.NO and previous_price <= current_price and next_price >= current_price:
-            step_reward += ((next_price - previous_price) / previous_price) * 100
-        # if NO Position, price is lower than previouse and higher than next (i.e. a dropping price)
-        elif env._position == Positions.NO and previous_price >= current_price and next_price <= current_price:
-            step_reward += ((previous_price - next_price) / next_price) * 100
-
-        return step_reward
\ No newline at end of file
+        pyplot().show()
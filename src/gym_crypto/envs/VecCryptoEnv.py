@@ -0,0 +1,108 @@
+import numpy as np
+from gym.vector import VectorEnv
+
+from gym_crypto.envs.CryptoEnv import CryptoEnv, Positions
+from gym_crypto.kernels import get_step_kernels
+
+
+class VecCryptoEnv(VectorEnv):
+    """Runs ``num_envs`` CryptoEnv episodes over the same data with one compiled call per step.
+
+    The episode state (ticks, position, totals) is kept as arrays over the episodes instead of one
+    Python object per episode. ``step``/``reset`` follow ``CryptoEnv.step``/``CryptoEnv.reset``, finished
+    episodes are reset automatically and their last observation is returned in ``info['final_observation']``.
+    The per step ``recorder`` of CryptoEnv is not kept.
+    """
+
+    def __init__(self, df, window_size, num_envs, reward_algo='algorithm1'):
+        # template env, owns the processed data and the reward/fee settings
+        self.env = CryptoEnv(df, window_size, reward_algo=reward_algo, record='off')
+        super().__init__(num_envs, self.env.observation_space, self.env.action_space)
+
+        self.window_size = window_size
+        self.prices = self.env.prices
+        self.signal_features = self.env.signal_features
+        self.shape = self.env.shape
+
+        self._start_tick = self.env._start_tick
+        self._end_tick = self.env._end_tick
+        self._price_index = self.env._price_index
+        self._step_batch_kernel = get_step_kernels(self.env.reward_algo)[1]
+
+        self._actions = None
+        self._reward_params = None
+        self._done = np.zeros(num_envs, dtype=bool)
+        self._current_tick = np.zeros(num_envs, dtype=np.int64)
+        self._last_trade_tick = np.zeros(num_envs, dtype=np.int64)
+        self._last_sell_tick = np.zeros(num_envs, dtype=np.int64)
+        self._last_buy_tick = np.zeros(num_envs, dtype=np.int64)
+        self._position = np.zeros(num_envs, dtype=np.int64)
+        self._total_reward = np.zeros(num_envs, dtype=np.float64)
+        self._total_profit = np.ones(num_envs, dtype=np.float64)
+
+    def _reset_episodes(self, mask):
+        self._done[mask] = False
+        self._current_tick[mask] = self._start_tick
+        self._last_trade_tick[mask] = self._start_tick - 1
+        self._last_sell_tick[mask] = self._start_tick - 1
+        self._last_buy_tick[mask] = self._start_tick - 1
+        self._position[mask] = Positions.NO.value
+        self._total_reward[mask] = 0.0
+        self._total_profit[mask] = 1.0  # unit
+
+    def reset_wait(self, seed=None, options=None):
+        self._reward_params = self.env._get_reward_params()
+        self._reset_episodes(slice(None))
+        return self._get_observation()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self._actions
+        self._current_tick += 1
+        self._done = self._current_tick == self._end_tick
+
+        step_reward = self._step_batch_kernel(
+            actions,
+            self._done,
+            self._position,
+            self._current_tick,
+            self._last_trade_tick,
+            self._last_buy_tick,
+            self._last_sell_tick,
+            self._total_reward,
+            self._total_profit,
+            self.prices,
+            self._price_index.data,
+            self._reward_params,
+            self.env.trade_fee_bid_percent,
+            self.env.trade_fee_ask_percent,
+        )
+
+        observation = self._get_observation()
+        info = dict(
+            step_reward=step_reward,
+            total_reward=self._total_reward.copy(),
+            total_profit=self._total_profit.copy(),
+            position=self._position.copy(),
+        )
+        done = self._done.copy()
+
+        if done.any():
+            final_observation = np.empty(self.num_envs, dtype=object)
+            for i in np.flatnonzero(done):
+                final_observation[i] = observation[i].copy()
+            info['final_observation'] = final_observation
+            info['_final_observation'] = done
+
+            self._reset_episodes(done)
+            observation[done] = self._get_observation()[done]
+
+        return observation, step_reward, done, info
+
+    def _get_observation(self):
+        return self.env._observations[self._current_tick - self.window_size]
+
+    def max_possible_profit(self):
+        return self.env.max_possible_profit()
@@ -1 +1,2 @@
-from gym_crypto.envs.CryptoEnv import CryptoEnv
\ No newline at end of file
+from gym_crypto.envs.CryptoEnv import CryptoEnv
+from gym_crypto.envs.VecCryptoEnv import VecCryptoEnv
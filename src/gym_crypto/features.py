@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import talib
+from talib import abstract
+
+# bump when the computation changes so old cache files are not used anymore
+CACHE_VERSION = 1
+
+# features that are not TA-Lib functions as (inputs, function, lookback), both match what CryptoEnv used before
+# the pipeline existed
+BUILTIN_FEATURES = {
+    'CLOSE': (('close',), lambda close: close, 0),
+    'DIFF': (('close',), lambda close: np.insert(np.diff(close), 0, 0), 1),
+}
+
+
+def atomic_save_npy(path, array):
+    """Save ``array`` to ``path`` through a temporary file, other processes may be writing the same file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+class FeaturePipeline:
+    """Computes the feature matrix of a candle DataFrame from a list of indicator specs.
+
+    Every spec is a ``(function, params)`` tuple, ``function`` is a TA-Lib function name (``'RSI'``,
+    ``'MACD'``, ``'ATR'``, ...) or one of ``BUILTIN_FEATURES``, ``params`` the keyword arguments of the
+    function. Functions with several outputs add a column per output. TA-Lib inputs (open, high, low, close,
+    volume) are taken from the DataFrame columns of the same name, ignoring case.
+
+    ``normalize`` is None, ``'zscore'`` or ``'minmax'`` and is applied per column with the statistics of each row
+    and the rows before it, all of them or the last ``normalize_window``. Statistics over the whole frame would
+    leak later prices into every observation. Rows without a value (indicator warm up) are filled with
+    ``fill_value`` afterwards.
+
+    With a ``cache_dir`` the matrix is stored as ``.npy`` under a hash of the used input columns and the
+    pipeline config, and later transforms of the same data load it memory-mapped instead of recomputing.
+
+    ``transform_tail`` computes only the last rows, for streaming. Smoothed TA-Lib indicators (EMA, RSI, MACD,
+    ATR, ...) depend on the whole history, so their tail is computed from ``stream_context`` extra rows, after
+    which they match a full transform to float32 precision. Normalized features can only be streamed with a
+    ``normalize_window``.
+    """
+
+    def __init__(
+        self, specs, normalize=None, normalize_window=None, fill_value=0.0, cache_dir=None, stream_context=1000
+    ):
+        if normalize not in (None, 'zscore', 'minmax'):
+            raise ValueError(f'unknown normalize {normalize!r}, use None, zscore or minmax')
+
+        self.specs = [(function.upper(), dict(params)) for function, params in specs]
+        self.normalize = normalize
+        self.normalize_window = normalize_window
+        self.fill_value = fill_value
+        self.cache_dir = None if cache_dir is None else os.path.expanduser(cache_dir)
+        self.stream_context = stream_context
+
+        self.inputs = []
+        self.columns = []
+        # rows before the first value of the slowest feature
+        self.lookback = 0
+        self._smoothed = False
+        # cumulative outputs (e.g. OBV) differ by an offset when computed from a tail
+        self._path_dependent = []
+        for function, params in self.specs:
+            if function in BUILTIN_FEATURES:
+                inputs, outputs = BUILTIN_FEATURES[function][0], [function.lower()]
+                self.lookback = max(self.lookback, BUILTIN_FEATURES[function][2])
+            else:
+                ta_function = abstract.Function(function)
+                unknown = set(params) - set(ta_function.parameters)
+                if unknown:
+                    raise ValueError(f'unknown parameters {sorted(unknown)} for {function}')
+                self.lookback = max(self.lookback, abstract.Function(function, **params).lookback)
+                # the unstable period flag of TA-Lib misses some smoothed functions (MACD), all get the context
+                self._smoothed = True
+                if 'Output is path-dependent' in ta_function.function_flags:
+                    self._path_dependent.append(function)
+                inputs = []
+                for names in ta_function.input_names.values():
+                    inputs.extend([names] if isinstance(names, str) else names)
+                outputs = ta_function.output_names
+
+            self.inputs.extend(name for name in inputs if name not in self.inputs)
+            suffix = ''.join(f'_{value}' for value in params.values())
+            self.columns.extend(
+                f'{function}{suffix}' if len(outputs) == 1 else f'{function}{suffix}_{output}' for output in outputs
+            )
+
+    @property
+    def config(self):
+        return dict(
+            version=CACHE_VERSION,
+            talib=talib.__version__,
+            specs=self.specs,
+            normalize=self.normalize,
+            normalize_window=self.normalize_window,
+            fill_value=self.fill_value,
+        )
+
+    def input_arrays(self, df):
+        """The float64 input columns of ``df`` by TA-Lib input name."""
+        columns = {column.lower(): column for column in df.columns}
+        missing = [name for name in self.inputs if name not in columns]
+        if missing:
+            raise KeyError(f'DataFrame has no columns for {missing}')
+        return {name: np.asarray(df[columns[name]], dtype=np.float64) for name in self.inputs}
+
+    def config_key(self):
+        return hashlib.blake2b(json.dumps(self.config, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+    def cache_key(self, df):
+        digest = hashlib.blake2b(json.dumps(self.config, sort_keys=True).encode(), digest_size=20)
+        for name, values in self.input_arrays(df).items():
+            digest.update(name.encode())
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+        return digest.hexdigest()
+
+    def transform(self, df):
+        """Return the ``(len(df), len(columns))`` float32 feature matrix of ``df``.
+
+        ``df`` may be anything with ``columns`` and array-like columns, such as a ``CandleDataset``.
+        """
+        if self.cache_dir is None:
+            return self._compute(self.input_arrays(df))
+
+        path = os.path.join(self.cache_dir, f'{self.cache_key(df)}.npy')
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+
+        atomic_save_npy(path, self._compute(self.input_arrays(df)))
+        return np.load(path, mmap_mode='r')
+
+    def transform_tail(self, df, n_rows):
+        """Return the features of the last ``n_rows`` of ``df``, reading only its last ``tail_rows(n_rows)`` rows."""
+        if self.normalize is not None and self.normalize_window is None:
+            raise ValueError('features normalized by all rows before them need every row, set a normalize_window')
+        if self._path_dependent:
+            raise ValueError(f'{self._path_dependent} depend on every row and can not be computed from the tail')
+        tail = self.tail_rows(n_rows)
+        inputs = {name: values[-tail:] for name, values in self.input_arrays(df).items()}
+        return self._compute(inputs)[-n_rows:]
+
+    def tail_rows(self, n_rows):
+        """Input rows ``transform_tail`` needs to compute the features of ``n_rows`` rows."""
+        # a normalize window needs the features of the rows before the first one
+        window = self.normalize_window - 1 if self.normalize is not None and self.normalize_window else 0
+        return n_rows + window + self.lookback + (self.stream_context if self._smoothed else 0)
+
+    def _compute(self, inputs):
+        n_rows = len(next(iter(inputs.values()))) if inputs else 0
+        features = np.empty((n_rows, len(self.columns)), dtype=np.float64)
+
+        column = 0
+        for function, params in self.specs:
+            if function in BUILTIN_FEATURES:
+                names, feature, _ = BUILTIN_FEATURES[function]
+                outputs = [feature(*(inputs[name] for name in names))]
+            else:
+                outputs = abstract.Function(function)(inputs, **params)
+                if isinstance(outputs, np.ndarray):
+                    outputs = [outputs]
+            for output in outputs:
+                features[:, column] = output
+                column += 1
+
+        if self.normalize is not None:
+            # expanding or rolling, so a row is only scaled by the rows up to it
+            frame = pd.DataFrame(features)
+            if self.normalize_window is None:
+                window = frame.expanding()
+            else:
+                window = frame.rolling(self.normalize_window, min_periods=1)
+            if self.normalize == 'zscore':
+                std = window.std(ddof=0).to_numpy()
+                features = (features - window.mean().to_numpy()) / np.where(std > 0, std, 1)
+            else:
+                low = window.min().to_numpy()
+                span = window.max().to_numpy() - low
+                features = (features - low) / np.where(span > 0, span, 1)
+
+        features[np.isnan(features)] = self.fill_value
+        return features.astype(np.float32)
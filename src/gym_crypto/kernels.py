@@ -0,0 +1,279 @@
+"""Compiled step of CryptoEnv: reward, profit update and position flip in one call.
+
+The kernels are specialised per reward algorithm. Passing the reward function as an argument instead would
+make numba type it on every call, which costs more than the step itself. The kernels defined here call
+``algorithm1`` and are cached on disk, so new processes load them instead of compiling. For other reward
+algorithms ``get_step_kernels`` compiles copies of them, closures can not be cached by numba. The reward
+functions and ``step_kernel`` are inlined by numba (``inline='always'``), a regular call would incref and
+decref every array of the price index each step.
+"""
+import hashlib
+import os
+import types
+
+import numpy as np
+from numba import jit, njit, prange
+
+from gym_crypto import range_index, rewards
+from gym_crypto.rewards import BUY, NO, SELL, YES, algorithm1
+
+# reward called by the kernels below, rebound in the copies made by _specialise
+reward_algo = algorithm1
+
+
+def get_step_kernels(reward_fn):
+    """Return ``(step_kernel, step_batch_kernel, episode_kernel)`` for ``reward_fn``, compiled on first use."""
+    if reward_fn not in _STEP_KERNELS:
+        _STEP_KERNELS[reward_fn] = _specialise(reward_fn)
+    return _STEP_KERNELS[reward_fn]
+
+
+@njit(cache=True, inline='always')
+def step_kernel(
+    action,
+    done,
+    position,
+    current_tick,
+    last_trade_tick,
+    last_buy_tick,
+    last_sell_tick,
+    total_profit,
+    prices,
+    price_index,
+    params,
+    trade_fee_bid_percent,
+    trade_fee_ask_percent,
+):
+    step_reward = reward_algo(
+        action, position, current_tick, last_buy_tick, last_sell_tick, prices, price_index, params
+    )
+
+    # profit is only realised when the episode ends holding a position
+    if position == YES and done:
+        shares = (total_profit * (1 - trade_fee_ask_percent)) / prices[last_buy_tick]
+        total_profit = (shares * (1 - trade_fee_bid_percent)) * prices[current_tick]
+
+    if (action == BUY and position == NO) or (action == SELL and position == YES):
+        position = NO if position == YES else YES
+        last_trade_tick = current_tick
+
+        if action == BUY:
+            last_buy_tick = current_tick
+        else:
+            last_sell_tick = current_tick
+
+    return step_reward, position, last_trade_tick, last_buy_tick, last_sell_tick, total_profit
+
+
+@njit(cache=True)
+def step_batch_kernel(
+    actions,
+    done,
+    position,
+    current_tick,
+    last_trade_tick,
+    last_buy_tick,
+    last_sell_tick,
+    total_reward,
+    total_profit,
+    prices,
+    price_index,
+    params,
+    trade_fee_bid_percent,
+    trade_fee_ask_percent,
+):
+    # step_kernel over arrays of episodes, the state arrays are updated in place
+    step_reward = np.empty(len(actions), dtype=np.float64)
+
+    for i in range(len(actions)):
+        (
+            step_reward[i],
+            position[i],
+            last_trade_tick[i],
+            last_buy_tick[i],
+            last_sell_tick[i],
+            total_profit[i],
+        ) = step_kernel(
+            actions[i],
+            done[i],
+            position[i],
+            current_tick[i],
+            last_trade_tick[i],
+            last_buy_tick[i],
+            last_sell_tick[i],
+            total_profit[i],
+            prices,
+            price_index,
+            params,
+            trade_fee_bid_percent,
+            trade_fee_ask_percent,
+        )
+        total_reward[i] += step_reward[i]
+
+    return step_reward
+
+
+@njit(cache=True, parallel=True)
+def episode_kernel(
+    actions,
+    start_tick,
+    end_tick,
+    prices,
+    price_index,
+    params,
+    trade_fee_bid_percent,
+    trade_fee_ask_percent,
+):
+    # plays every row of ``actions`` as an episode from reset, same as calling CryptoEnv.step for each action
+    n_episodes, n_steps = actions.shape
+    rewards = np.zeros((n_episodes, n_steps), dtype=np.float64)
+    positions = np.zeros((n_episodes, n_steps), dtype=np.int8)
+    trades = np.zeros((n_episodes, n_steps), dtype=np.bool_)
+    total_reward = np.zeros(n_episodes, dtype=np.float64)
+    total_profit = np.ones(n_episodes, dtype=np.float64)
+
+    # episodes are independent, numba spreads them over the cpu cores
+    for episode in prange(n_episodes):
+        position = NO
+        current_tick = start_tick
+        last_trade_tick = last_buy_tick = last_sell_tick = start_tick - 1
+        episode_reward = 0.0
+        episode_profit = 1.0
+
+        for i in range(n_steps):
+            current_tick += 1
+            step_reward, new_position, last_trade_tick, last_buy_tick, last_sell_tick, episode_profit = step_kernel(
+                actions[episode, i],
+                current_tick == end_tick,
+                position,
+                current_tick,
+                last_trade_tick,
+                last_buy_tick,
+                last_sell_tick,
+                episode_profit,
+                prices,
+                price_index,
+                params,
+                trade_fee_bid_percent,
+                trade_fee_ask_percent,
+            )
+            episode_reward += step_reward
+            rewards[episode, i] = step_reward
+            positions[episode, i] = new_position
+            trades[episode, i] = new_position != position
+            position = new_position
+
+        total_reward[episode] = episode_reward
+        total_profit[episode] = episode_profit
+
+    return rewards, positions, trades, total_reward, total_profit
+
+
+_STEP_KERNELS = {algorithm1: (step_kernel, step_batch_kernel, episode_kernel)}
+
+
+def _specialise(reward_fn):
+    # the kernels above compiled again from their source with reward_algo, and the kernels they call, rebound
+    namespace = dict(globals(), reward_algo=reward_fn)
+    kernels = []
+    for kernel in _STEP_KERNELS[algorithm1]:
+        function = types.FunctionType(kernel.py_func.__code__, namespace, kernel.py_func.__name__)
+        namespace[kernel.py_func.__name__] = jit(**kernel.targetoptions)(function)
+        kernels.append(namespace[kernel.py_func.__name__])
+    return tuple(kernels)
+
+
+@njit(cache=True)
+def max_profit_kernel(prices, start_tick, end_tick):
+    # buys at the start and sells at the end of every rising run of prices[start_tick - 1 : end_tick + 1]
+    buy_ticks = np.empty(end_tick - start_tick + 1, dtype=np.int64)
+    sell_ticks = np.empty(end_tick - start_tick + 1, dtype=np.int64)
+    n_trades = 0
+
+    current_tick = start_tick
+    last_trade_tick = current_tick - 1
+    profit = 1.0
+
+    while current_tick <= end_tick:
+        if prices[current_tick] < prices[current_tick - 1]:
+            while current_tick <= end_tick and prices[current_tick] < prices[current_tick - 1]:
+                current_tick += 1
+        else:
+            while current_tick <= end_tick and prices[current_tick] >= prices[current_tick - 1]:
+                current_tick += 1
+
+            shares = profit / prices[last_trade_tick]
+            profit = shares * prices[current_tick - 1]
+            buy_ticks[n_trades] = last_trade_tick
+            sell_ticks[n_trades] = current_tick - 1
+            n_trades += 1
+        last_trade_tick = current_tick - 1
+
+    return profit, buy_ticks[:n_trades], sell_ticks[:n_trades]
+
+
+@njit(cache=True)
+def max_profit_fees_kernel(prices, start_tick, end_tick, trade_fee_bid_percent, trade_fee_ask_percent):
+    # with fees, riding out a small dip can beat selling and buying back, so the best trades are found with a
+    # dynamic program over holding cash or shares at every tick, then traced back from cash at the end
+    n_ticks = end_tick - start_tick + 2
+    bought = np.zeros(n_ticks, dtype=np.bool_)
+    sold = np.zeros(n_ticks, dtype=np.bool_)
+    cash = 1.0
+    shares = 0.0
+
+    for i in range(n_ticks):
+        price = prices[start_tick - 1 + i]
+        buy_shares = (cash * (1 - trade_fee_ask_percent)) / price
+        sell_cash = (shares * (1 - trade_fee_bid_percent)) * price
+        if buy_shares > shares:
+            shares = buy_shares
+            bought[i] = True
+        if sell_cash > cash:
+            cash = sell_cash
+            sold[i] = True
+
+    buy_ticks = np.empty(n_ticks, dtype=np.int64)
+    sell_ticks = np.empty(n_ticks, dtype=np.int64)
+    n_trades = 0
+    holding = False
+    for i in range(n_ticks - 1, -1, -1):
+        if holding and bought[i]:
+            buy_ticks[n_trades - 1] = start_tick - 1 + i
+            holding = False
+        elif not holding and sold[i]:
+            sell_ticks[n_trades] = start_tick - 1 + i
+            n_trades += 1
+            holding = True
+
+    return cash, buy_ticks[:n_trades][::-1].copy(), sell_ticks[:n_trades][::-1].copy()
+
+
+def _drop_stale_caches(kernels):
+    # numba only checks the source file of a cached function for changes, not the files of the functions compiled
+    # into it. The caches are dropped when rewards.py or range_index.py changed since they were written.
+    if not hasattr(getattr(kernels[0], '_cache', None), '_cache_path'):
+        # not cached, e.g. with NUMBA_DISABLE_JIT
+        return
+    digest = hashlib.blake2b(digest_size=16)
+    for module in (rewards, range_index):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    stamp = os.path.join(kernels[0]._cache._cache_path, 'kernels.sources')
+    try:
+        with open(stamp) as f:
+            if f.read() == digest.hexdigest():
+                return
+    except OSError:
+        pass
+    try:
+        for kernel in kernels:
+            kernel._cache.flush()
+        with open(stamp, 'w') as f:
+            f.write(digest.hexdigest())
+    except OSError:
+        # numba does not cache either without a writable cache directory
+        pass
+
+
+_drop_stale_caches(_STEP_KERNELS[algorithm1] + (algorithm1,))
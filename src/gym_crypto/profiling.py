@@ -0,0 +1,61 @@
+from time import perf_counter_ns
+
+# phases of CryptoEnv timed by Profiler, step is split in the first three
+PHASES = (
+    'kernel',  # compiled reward, profit update and position flip
+    'record',  # EpisodeRecorder row and Positions update
+    'observation',  # observation window and info dict
+    'reset',
+    'oracle',  # max_possible_profit/oracle_trades
+    'append',  # append_candles
+    'compile',  # steps that loaded or compiled the step kernel, numba does it on the first step
+)
+
+
+class Profiler:
+    """Wall time and call count per phase of a CryptoEnv, created with ``CryptoEnv(..., profile=True)``.
+
+    The env calls ``start`` when a phase begins and ``mark`` when it ends, a ``mark`` directly after another
+    one times the phase in between. The kernel call of a step that loads or compiles the step kernel (the first
+    step with new argument types) is timed as ``compile`` instead of ``kernel``, it would swamp the kernel time.
+    ``counters`` holds event counts (``trades``, ``episodes``, ``oracle_hits``). With profiling off the env only
+    checks that its ``profiler`` is None.
+    """
+
+    __slots__ = ('times', 'calls', 'counters', '_last')
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.counters = dict(trades=0, episodes=0, oracle_hits=0)
+        self._last = 0
+
+    def start(self):
+        self._last = perf_counter_ns()
+
+    def mark(self, phase):
+        now = perf_counter_ns()
+        self.times[phase] += now - self._last
+        self.calls[phase] += 1
+        self._last = now
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def clear(self):
+        self.__init__()
+
+    def stats(self):
+        """Per phase ``calls``, ``total_s`` and ``mean_us``, ``share`` of the step time for step phases."""
+        step_time = sum(self.times[phase] for phase in PHASES[:3])
+        phases = {}
+        for phase in PHASES:
+            calls = self.calls[phase]
+            phases[phase] = dict(
+                calls=calls,
+                total_s=self.times[phase] / 1e9,
+                mean_us=self.times[phase] / calls / 1e3 if calls else 0.0,
+            )
+            if phase in PHASES[:3]:
+                phases[phase]['share'] = self.times[phase] / step_time if step_time else 0.0
+        return dict(phases=phases, counters=dict(self.counters), steps=self.calls['kernel'] + self.calls['compile'])
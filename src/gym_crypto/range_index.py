@@ -0,0 +1,202 @@
+import numpy as np
+from numba import njit
+
+# header of RangeIndex.data: block size, number of blocks, sparse table levels, number of values
+_HEADER = 4
+
+
+class RangeIndex:
+    """Constant time min/max of ``values[start:end]`` using a block decomposition.
+
+    The values are split in blocks of ``block_size``. Per block a prefix and suffix min/max is kept and a
+    sparse table is built over the block min/max, so a query spanning several blocks takes at most six
+    lookups and a query inside one block scans less than ``block_size`` values. Memory use is about
+    five times the input plus a small table over the blocks.
+
+    Everything is stored in the single float64 array ``data``, which is what compiled code gets passed. A
+    tuple of arrays would make numba incref and decref each of them on every call.
+
+    ``capacity`` reserves room for values added later with ``append``.
+    """
+
+    def __init__(self, values, block_size=64, capacity=None):
+        values = np.asarray(values, dtype=np.float64)
+        self.block_size = block_size
+        self.n = len(values)
+        n_blocks = max(-(-max(self.n, capacity or 0) // block_size), 1)
+        levels = max(n_blocks.bit_length(), 1)
+        size = n_blocks * block_size
+
+        self.data = np.empty(_HEADER + 5 * size + 1 + (n_blocks + 1) + 2 * levels * n_blocks, dtype=np.float64)
+        self.data[:_HEADER] = block_size, n_blocks, levels, self.n
+        padded, prefix_min, prefix_max, suffix_min, suffix_max, log2, table_min, table_max = np.split(
+            self.data[_HEADER:],
+            np.cumsum([size + 1, size, size, size, size, n_blocks + 1, levels * n_blocks]),
+        )
+
+        # padded with the last value, the padding is never part of a queried range
+        padded[: self.n] = values
+        padded[self.n :] = values[-1]
+        self.values = padded[: self.n]
+
+        blocks = padded[:-1].reshape(n_blocks, block_size)
+        prefix_min[:] = np.minimum.accumulate(blocks, axis=1).ravel()
+        prefix_max[:] = np.maximum.accumulate(blocks, axis=1).ravel()
+        suffix_min[:] = np.minimum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+        suffix_max[:] = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+        # sparse table over the blocks, row k holds the extrema of 2**k blocks starting at each block
+        log2[0] = 0
+        log2[1:] = np.frexp(np.arange(1, n_blocks + 1))[1] - 1
+        table_min = table_min.reshape(levels, n_blocks)
+        table_max = table_max.reshape(levels, n_blocks)
+        table_min[0] = blocks.min(axis=1)
+        table_max[0] = blocks.max(axis=1)
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            table_min[k, :-half] = np.minimum(table_min[k - 1, :-half], table_min[k - 1, half:])
+            table_max[k, :-half] = np.maximum(table_max[k - 1, :-half], table_max[k - 1, half:])
+
+    @property
+    def capacity(self):
+        return int(self.data[1]) * self.block_size
+
+    @classmethod
+    def from_data(cls, data):
+        """Wrap an existing ``data`` array, e.g. one saved with ``np.save`` and loaded memory-mapped."""
+        index = cls.__new__(cls)
+        index.data = data
+        index.block_size = int(data[0])
+        index.n = int(data[3])
+        index.values = data[_HEADER : _HEADER + index.n]
+        return index
+
+    def append(self, values):
+        """Add ``values`` after the last value, amortised constant time per value.
+
+        The index is updated in place, or rebuilt with twice the needed capacity when it is full or ``data`` is
+        read-only (e.g. loaded memory-mapped). Either way ``data`` and ``values`` may be new arrays afterwards.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        n = self.n + len(values)
+        if n > self.capacity or not self.data.flags.writeable:
+            grown = RangeIndex(np.concatenate([self.values, values]), self.block_size, capacity=2 * n)
+            self.data = grown.data
+        else:
+            _extend(self.data, values)
+        self.n = n
+        self.values = self.data[_HEADER : _HEADER + n]
+
+    def extrema(self, start, end):
+        """Return ``(min, max)`` of ``values[start:end]``, the range may not be empty."""
+        return range_extrema(self.data, start, end)
+
+    def extrema_many(self, start, end):
+        """Vectorized ``extrema`` over arrays of range bounds."""
+        return _range_extrema_many(self.data, np.asarray(start, dtype=np.int64), np.asarray(end, dtype=np.int64))
+
+
+@njit(cache=True, inline='always')
+def range_extrema(index, start, end):
+    """Compiled ``RangeIndex.extrema``, ``index`` is ``RangeIndex.data``."""
+    block_size = int(index[0])
+    n_blocks = int(index[1])
+    levels = int(index[2])
+    size = n_blocks * block_size
+    padded = _HEADER
+    prefix_min = padded + size + 1
+    prefix_max = prefix_min + size
+    suffix_min = prefix_max + size
+    suffix_max = suffix_min + size
+    log2 = suffix_max + size
+    table_min = log2 + n_blocks + 1
+    table_max = table_min + levels * n_blocks
+
+    first_block = start // block_size
+    last_block = (end - 1) // block_size
+
+    if first_block == last_block:
+        range_min = index[padded + start]
+        range_max = index[padded + start]
+        for tick in range(padded + start + 1, padded + end):
+            if index[tick] < range_min:
+                range_min = index[tick]
+            if index[tick] > range_max:
+                range_max = index[tick]
+        return range_min, range_max
+
+    range_min = min(index[suffix_min + start], index[prefix_min + end - 1])
+    range_max = max(index[suffix_max + start], index[prefix_max + end - 1])
+
+    if last_block - first_block > 1:
+        left = first_block + 1
+        k = int(index[log2 + last_block - left])
+        right = last_block - (1 << k)
+        range_min = min(range_min, index[table_min + k * n_blocks + left], index[table_min + k * n_blocks + right])
+        range_max = max(range_max, index[table_max + k * n_blocks + left], index[table_max + k * n_blocks + right])
+
+    return range_min, range_max
+
+
+@njit(cache=True)
+def _range_extrema_many(index, start, end):
+    range_min = np.empty(len(start), dtype=np.float64)
+    range_max = np.empty(len(start), dtype=np.float64)
+    for i in range(len(start)):
+        range_min[i], range_max[i] = range_extrema(index, start[i], end[i])
+    return range_min, range_max
+
+
+@njit(cache=True)
+def _extend(index, values):
+    # RangeIndex.append within capacity: only the blocks receiving values and the sparse table entries ending
+    # at them change, entries spanning later blocks are computed when those blocks are filled
+    block_size = int(index[0])
+    n_blocks = int(index[1])
+    levels = int(index[2])
+    n = int(index[3])
+    size = n_blocks * block_size
+    padded = _HEADER
+    prefix_min = padded + size + 1
+    prefix_max = prefix_min + size
+    suffix_min = prefix_max + size
+    suffix_max = suffix_min + size
+    table_min = suffix_max + size + n_blocks + 1
+    table_max = table_min + levels * n_blocks
+
+    new_n = n + len(values)
+    for i in range(len(values)):
+        index[padded + n + i] = values[i]
+    last_block = (new_n - 1) // block_size
+    # padded with the last value to the end of its block, like RangeIndex.__init__
+    for tick in range(new_n, (last_block + 1) * block_size):
+        index[padded + tick] = values[-1]
+    index[3] = new_n
+
+    for block in range(n // block_size, last_block + 1):
+        first = block * block_size
+        index[prefix_min + first] = index[prefix_max + first] = index[padded + first]
+        for tick in range(first + 1, first + block_size):
+            index[prefix_min + tick] = min(index[prefix_min + tick - 1], index[padded + tick])
+            index[prefix_max + tick] = max(index[prefix_max + tick - 1], index[padded + tick])
+        final = first + block_size - 1
+        index[suffix_min + final] = index[suffix_max + final] = index[padded + final]
+        for tick in range(final - 1, first - 1, -1):
+            index[suffix_min + tick] = min(index[suffix_min + tick + 1], index[padded + tick])
+            index[suffix_max + tick] = max(index[suffix_max + tick + 1], index[padded + tick])
+
+        index[table_min + block] = index[prefix_min + final]
+        index[table_max + block] = index[prefix_max + final]
+        for k in range(1, levels):
+            start = block - (1 << k) + 1
+            if start < 0:
+                break
+            half = 1 << (k - 1)
+            index[table_min + k * n_blocks + start] = min(
+                index[table_min + (k - 1) * n_blocks + start], index[table_min + (k - 1) * n_blocks + start + half]
+            )
+            index[table_max + k * n_blocks + start] = max(
+                index[table_max + (k - 1) * n_blocks + start], index[table_max + (k - 1) * n_blocks + start + half]
+            )
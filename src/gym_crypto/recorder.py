@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# what EpisodeRecorder keeps per tick, every level includes the columns of the one before
+RECORD_LEVELS = {
+    'off': (),
+    'summary': ('action', 'position'),
+    'full': ('action', 'position', 'step_reward', 'total_reward', 'total_profit'),
+}
+
+
+class EpisodeRecorder:
+    """Per tick record of a CryptoEnv episode in preallocated NumPy columns.
+
+    Row 0 is the tick ``reset`` returns at, row ``i`` the tick reached by step ``i``. The columns are allocated
+    once for the longest episode, ``reset`` only rewinds them. ``level`` selects the columns kept, see
+    ``RECORD_LEVELS``: ``'off'`` keeps nothing, ``'summary'`` the actions and positions (what ``render_all``
+    needs) and ``'full'`` also the rewards and profit.
+
+    The ``action``/``position``/... attributes are views of the recorded rows, ``to_dataframe`` wraps them
+    without copying. ``length`` is the number of recorded rows, setting it lower rewinds the recorder (this is
+    what ``CryptoEnv.set_state`` does), the next ``record`` overwrites the rows after it.
+    """
+
+    __slots__ = (
+        'level',
+        'start_tick',
+        'end_tick',
+        'length',
+        '_columns',
+        '_depth',
+        '_action',
+        '_position',
+        '_step_reward',
+        '_total_reward',
+        '_total_profit',
+    )
+
+    def __init__(self, start_tick, end_tick, level='full'):
+        if level not in RECORD_LEVELS:
+            raise ValueError(f'unknown record level {level!r}, use one of {list(RECORD_LEVELS)}')
+        self.level = level
+        self.start_tick = start_tick
+        self.end_tick = end_tick
+        self.length = 0
+        # index of the level, record branches on it instead of looking up columns
+        self._depth = list(RECORD_LEVELS).index(level)
+
+        # rows after length are never read, so they are not zeroed
+        size = end_tick - start_tick + 1
+        self._set_columns(
+            {
+                name: np.empty(size, dtype=np.int8 if name in ('action', 'position') else np.float64)
+                for name in RECORD_LEVELS[level]
+            }
+        )
+
+    def _set_columns(self, columns):
+        self._columns = columns
+        # record writes through memoryviews, storing a Python scalar in one is about twice as fast as in an ndarray
+        for name in RECORD_LEVELS['full']:
+            setattr(self, f'_{name}', memoryview(columns[name]) if name in columns else None)
+
+    def __getstate__(self):
+        # memoryviews can not be pickled (or deep copied), they are recreated from the columns
+        return dict(
+            level=self.level,
+            start_tick=self.start_tick,
+            end_tick=self.end_tick,
+            length=self.length,
+            depth=self._depth,
+            columns=self._columns,
+        )
+
+    def __setstate__(self, state):
+        self.level = state['level']
+        self.start_tick = state['start_tick']
+        self.end_tick = state['end_tick']
+        self.length = state['length']
+        self._depth = state['depth']
+        self._set_columns(state['columns'])
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __getattr__(self, name):
+        # only called for names that are not slots, i.e. the columns
+        columns = object.__getattribute__(self, '_columns')
+        if name not in columns:
+            raise AttributeError(f'{name!r} is not recorded at level {self.level!r}')
+        return columns[name][: self.length]
+
+    @property
+    def ticks(self):
+        return np.arange(self.start_tick, self.start_tick + self.length)
+
+    def reset(self, action, position, total_reward=0.0, total_profit=1.0):
+        self.length = 0
+        self.record(action, position, 0.0, total_reward, total_profit)
+
+    def record(self, action, position, step_reward, total_reward, total_profit):
+        row = self.length
+        self.length = row + 1
+        if self._depth:
+            self._action[row] = action
+            self._position[row] = position
+            if self._depth > 1:
+                self._step_reward[row] = step_reward
+                self._total_reward[row] = total_reward
+                self._total_profit[row] = total_profit
+
+    def reserve(self, end_tick):
+        """Make room for an episode running to ``end_tick``, growing the columns at least twofold when needed."""
+        if end_tick <= self.end_tick:
+            return
+        size = max(end_tick, 2 * self.end_tick - self.start_tick) - self.start_tick + 1
+        columns = {}
+        for name, column in self._columns.items():
+            columns[name] = np.empty(size, dtype=column.dtype)
+            columns[name][: self.length] = column[: self.length]
+        self.end_tick = self.start_tick + size - 1
+        self._set_columns(columns)
+
+    def copy(self):
+        """A recorder at the same level holding a copy of the recorded rows."""
+        recorder = EpisodeRecorder(self.start_tick, self.end_tick, self.level)
+        for name, column in self._columns.items():
+            recorder._columns[name][: self.length] = column[: self.length]
+        recorder.length = self.length
+        return recorder
+
+    def to_dataframe(self):
+        """The recorded rows as a DataFrame indexed by tick, sharing memory with the recorder."""
+        return pd.DataFrame(
+            {name: column[: self.length] for name, column in self._columns.items()},
+            index=pd.RangeIndex(self.start_tick, self.start_tick + self.length, name='tick'),
+            copy=False,
+        )
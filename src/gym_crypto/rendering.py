@@ -0,0 +1,148 @@
+import numpy as np
+
+from gym_crypto.rewards import BUY, HOLD, SELL
+
+# marker color per action value
+ACTION_COLORS = {BUY: 'green', HOLD: 'blue', SELL: 'red'}
+
+
+def pyplot():
+    """``matplotlib.pyplot``, imported on first use so envs that never render do not pay for it."""
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def decimate_minmax(values, n_buckets):
+    """Return ``(ticks, values)`` of the minimum and maximum of ``values`` in each of ``n_buckets`` buckets.
+
+    A line through them, in tick order, looks the same as the full line drawn ``n_buckets`` pixels wide, but
+    has at most ``2 * n_buckets`` points whatever the length of ``values``.
+    """
+    values = np.asarray(values)
+    if len(values) <= 2 * n_buckets:
+        return np.arange(len(values)), values
+
+    bucket = -(-len(values) // n_buckets)
+    n_buckets = -(-len(values) // bucket)
+    # the last bucket is padded with the last value, argmin/argmax return its first (real) occurrence
+    padded = np.empty(n_buckets * bucket, dtype=values.dtype)
+    padded[: len(values)] = values
+    padded[len(values) :] = values[-1]
+    buckets = padded.reshape(n_buckets, bucket)
+
+    starts = np.arange(n_buckets) * bucket
+    low = starts + buckets.argmin(axis=1)
+    high = starts + buckets.argmax(axis=1)
+    ticks = np.column_stack([np.minimum(low, high), np.maximum(low, high)]).ravel()
+    return ticks, values[ticks]
+
+
+def decimate_markers(ticks, actions, ticks_per_pixel):
+    """Return the indices of the first marker of each action in every pixel column, in tick order.
+
+    Markers of one action in the same column are drawn on top of each other, ``ticks`` are the sorted ticks of
+    the markers and ``ticks_per_pixel`` the column width.
+    """
+    keys = np.asarray(ticks) // ticks_per_pixel * len(ACTION_COLORS) + actions
+    _, keep = np.unique(keys, return_index=True)
+    return np.sort(keep)
+
+
+class EpisodeRenderer:
+    """Live plot of a CryptoEnv episode that redraws only what changes.
+
+    ``start`` draws the price line, min/max decimated to the figure width, once as the background.
+    ``add_markers`` adds the markers of new trades, keeping at most one per action and pixel column, so their
+    number is bounded by the figure width whatever the episode length. ``update`` restores the background and
+    draws the markers, one line artist per action, the current action and the title on top of it (blitting).
+    ``mode`` is ``'rgb_array'``, drawing headless on the Agg canvas and returning the frame, or ``'human'``,
+    drawing in a pyplot window.
+    """
+
+    def __init__(self, mode, figsize=(10, 5), dpi=100):
+        self.mode = mode
+        if mode == 'human':
+            plt = pyplot()
+            self.figure = plt.figure(figsize=figsize, dpi=dpi)
+            plt.show(block=False)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self.figure = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(self.figure)
+        self.canvas = self.figure.canvas
+        self.axes = self.figure.add_subplot()
+        self._background = None
+        self._lines = None
+        self._current = None
+        self._title = None
+        self._ticks_per_pixel = 1
+        # (ticks, prices) of the markers per action and their (pixel column, action) keys
+        self._markers = None
+        self._marker_keys = None
+        # actions whose line has markers it does not show yet
+        self._changed = set()
+        # the background has to be captured again when the window is resized
+        self.canvas.mpl_connect('draw_event', self._capture_background)
+
+    def start(self, prices):
+        self.axes.cla()
+        width = int(self.figure.get_figwidth() * self.figure.dpi)
+        self._ticks_per_pixel = max(-(-len(prices) // width), 1)
+        ticks, values = decimate_minmax(prices, width)
+        self.axes.plot(ticks, values, linewidth=0.8)
+        self.axes.set_xlim(0, max(len(prices) - 1, 1))
+        # markers of a line artist are rasterized once and stamped, a scatter draws every one as a path
+        style = dict(linestyle='', marker='o', markersize=4, markeredgewidth=0, zorder=3, animated=True)
+        self._lines = {
+            action: self.axes.plot([], [], color=color, **style)[0] for action, color in ACTION_COLORS.items()
+        }
+        self._current = self.axes.plot([], [], **style)[0]
+        self._title = self.figure.suptitle('', animated=True)
+        self._markers = {action: ([], []) for action in ACTION_COLORS}
+        self._marker_keys = set()
+        self._changed = set()
+        self.canvas.draw()
+        if self.mode == 'human':
+            self.canvas.flush_events()
+
+    def _capture_background(self, event=None):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def add_markers(self, ticks, prices, actions):
+        """Keep markers of ``actions`` at ``ticks`` (sorted) for the following frames."""
+        for i in decimate_markers(ticks, actions, self._ticks_per_pixel).tolist():
+            tick, action = int(ticks[i]), int(actions[i])
+            key = (tick // self._ticks_per_pixel, action)
+            if key not in self._marker_keys:
+                self._marker_keys.add(key)
+                self._markers[action][0].append(tick)
+                self._markers[action][1].append(prices[i])
+                self._changed.add(action)
+
+    def update(self, tick, price, action, title):
+        """Draw the markers, ``action`` at ``tick`` and ``title``, return the RGB frame in ``'rgb_array'`` mode."""
+        for changed in self._changed:
+            self._lines[changed].set_data(*self._markers[changed])
+        self._changed.clear()
+        self._current.set_data([tick], [price])
+        self._current.set_color(ACTION_COLORS[action])
+        self._title.set_text(title)
+
+        self.canvas.restore_region(self._background)
+        for line in self._lines.values():
+            self.axes.draw_artist(line)
+        self.axes.draw_artist(self._current)
+        self.figure.draw_artist(self._title)
+        self.canvas.blit(self.figure.bbox)
+
+        if self.mode == 'human':
+            self.canvas.flush_events()
+            return None
+        return np.array(self.canvas.buffer_rgba())[:, :, :3]
+
+    def close(self):
+        if self.mode == 'human':
+            pyplot().close(self.figure)
@@ -0,0 +1,118 @@
+"""Compiled reward algorithms.
+
+A reward algorithm is a numba ``njit`` function, preferably with ``inline='always'``, with the signature::
+
+    reward(action, position, current_tick, last_buy_tick, last_sell_tick, prices, price_index, params) -> float
+
+``action`` and ``position`` are the ``Actions``/``Positions`` values, the position is the one held before the
+action is applied. ``price_index`` is ``RangeIndex.data`` for use with ``range_extrema`` and ``params`` is
+the float64 array returned by ``CryptoEnv._get_reward_params``.
+
+Algorithms are registered by name with ``register_reward`` and selected with ``CryptoEnv(reward_algo=...)``.
+"""
+from numba import njit
+from numba.core.registry import CPUDispatcher
+
+from gym_crypto.range_index import range_extrema
+
+# Actions and Positions values, plain ints so they can be used in compiled code
+BUY = 0
+HOLD = 1
+SELL = 2
+
+NO = 0
+YES = 1
+
+REWARD_ALGORITHMS = {}
+
+
+def register_reward(name, reward_fn):
+    if not isinstance(reward_fn, CPUDispatcher):
+        raise TypeError(f'reward algorithm {name!r} must be a numba njit function')
+    REWARD_ALGORITHMS[name] = reward_fn
+    return reward_fn
+
+
+def get_reward(reward_algo):
+    if isinstance(reward_algo, str):
+        if reward_algo not in REWARD_ALGORITHMS:
+            raise KeyError(f'unknown reward algorithm {reward_algo!r}, registered: {sorted(REWARD_ALGORITHMS)}')
+        return REWARD_ALGORITHMS[reward_algo]
+    if not isinstance(reward_algo, CPUDispatcher):
+        raise TypeError('reward_algo must be a registered name or a numba njit function')
+    return reward_algo
+
+
+@njit(cache=True, inline='always')
+def algorithm1(action, position, current_tick, last_buy_tick, last_sell_tick, prices, price_index, params):
+    # params: look ahead range, profitable sell threshold (%), profitable sell reward, non profitable sell punishment
+    look_ahead_end = min(current_tick + int(params[0]), len(prices))
+    step_reward = 0.0
+
+    current_price = prices[current_tick]
+    last_buy_price = prices[last_buy_tick]
+    last_sell_price = prices[last_sell_tick]
+
+    if action == BUY:
+        if position == NO:
+            # lowest (bad, means this buy is sub-optimal) and highest (good) price since the last sell,
+            # the look ahead window is cut off at the last available price
+            temp_min_price, temp_max_price = range_extrema(price_index, last_sell_tick, look_ahead_end)
+
+            if current_price > temp_min_price:
+                # punishment for buying too high
+                step_reward += ((temp_min_price - current_price) / current_price) * 100
+
+            if current_price < temp_max_price:
+                # reward for buying at low point
+                # increase to prevent piramidding
+                step_reward += ((temp_max_price - current_price) / current_price) * 100
+
+        else:
+            # will be negative if this price is higher than the previous price and positive if reverse
+            step_reward += ((last_buy_price - current_price) / current_price) * 100
+
+    elif action == SELL:
+        # profit/loss reward/punishment
+        if position == YES:
+
+            # perhaps don't do this, a non-profitable sell could still be good if it saves you from further loss like
+            # in a downtrend, hard to tell whether it is a downtrend or not tho...
+            if last_buy_price * (1 + (params[1] / 100)) >= current_price:
+                step_reward += params[2]
+            else:
+                step_reward += params[3]
+
+            temp_min_price, temp_max_price = range_extrema(price_index, last_buy_tick, look_ahead_end)
+
+            if current_price < temp_max_price:
+                # punishment for selling too low
+                step_reward += ((current_price - temp_max_price) / temp_max_price) * 100
+
+            if current_price > temp_min_price:
+                # reward for selling above lowest point
+                step_reward += ((current_price - temp_min_price) / temp_min_price) * 100
+
+        else:
+            # scenario 1
+            # Sell after another sell that was at a higher price, bad sell
+            # scenario 2
+            # Sell after another sell that was at a lower price, good sell
+            step_reward += ((current_price - last_sell_price) / last_sell_price) * 100
+
+    elif action == HOLD:
+        previous_price = prices[current_tick - 1]
+        # on the last tick there is no next price, treat it as unchanged
+        next_price = prices[min(current_tick + 1, len(prices) - 1)]
+
+        # price is higher than previous and lower than next (i.e. a rising price), with or without position
+        if previous_price <= current_price and next_price >= current_price:
+            step_reward += ((next_price - previous_price) / previous_price) * 100
+        # price is lower than previous and higher than next (i.e. a dropping price), with or without position
+        elif previous_price >= current_price and next_price <= current_price:
+            step_reward += ((previous_price - next_price) / next_price) * 100
+
+    return step_reward
+
+
+register_reward('algorithm1', algorithm1)
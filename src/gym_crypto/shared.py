@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from gym_crypto.dataset import DEFAULT_FEATURES, CandleDataset, features_cache_name
+from gym_crypto.envs.CryptoEnv import Actions, CryptoEnv
+from gym_crypto.features import FeaturePipeline
+
+
+class SharedDataset:
+    """Publishes the data CryptoEnv needs into one ``multiprocessing.shared_memory`` block.
+
+    The owner process computes the columns, feature matrix and price range index once; other processes
+    ``attach`` to it with the picklable ``handle`` and get a ``CandleDataset`` whose arrays are read-only views
+    of the shared block, so they neither copy nor recompute anything::
+
+        with SharedDataset.publish(df, features=pipeline) as shared:
+            # in a worker
+            env = CryptoEnv(attach(shared.handle), window_size, features=pipeline)
+
+    The block is removed by ``close`` (or leaving the ``with``), attached datasets must not be used after that.
+    """
+
+    def __init__(self, shm, handle):
+        self._shm = shm
+        self.handle = handle
+
+    @classmethod
+    def publish(cls, df, features=None, columns=('Close',)):
+        if not isinstance(df, CandleDataset):
+            df = CandleDataset({column: df[column].to_numpy() for column in df.columns})
+        features = FeaturePipeline(DEFAULT_FEATURES) if features is None else features
+
+        # the names CandleDataset caches features and the range index under, attach fills its cache with them
+        arrays = {('column', column): np.asarray(df[column]) for column in columns}
+        arrays[('cache', features_cache_name(features))] = df.features(features)
+        arrays[('cache', 'range-index-Close')] = df.range_index('Close').data
+
+        # 64 byte aligned offsets inside the block
+        layout = {}
+        size = 0
+        for key, array in arrays.items():
+            layout[key] = (size, array.dtype.str, array.shape)
+            size += -(-array.nbytes // 64) * 64
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, array in arrays.items():
+            offset, dtype, shape = layout[key]
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+
+        return cls(shm, dict(name=shm.name, layout=layout))
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(handle):
+    """Return a read-only ``CandleDataset`` over the block published under ``handle``."""
+    shm = _open_untracked(handle['name'])
+
+    arrays = {}
+    for key, (offset, dtype, shape) in handle['layout'].items():
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[key] = array
+
+    dataset = CandleDataset({column: array for (kind, column), array in arrays.items() if kind == 'column'})
+    dataset._cache.update({name: array for (kind, name), array in arrays.items() if kind == 'cache'})
+    # keeps the mapping open as long as the dataset is used
+    dataset._shm = shm
+    return dataset
+
+
+def _open_untracked(name):
+    # the block is owned by the publishing process, a tracked attach would make the resource tracker remove it
+    # when the attaching process exits. Unregistering afterwards does not work either: pool workers share the
+    # tracker of the publisher and would drop its registration.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+_worker_env = None
+
+
+def _init_worker(handle, window_size, env_kwargs):
+    global _worker_env
+    _worker_env = CryptoEnv(attach(handle), window_size, **env_kwargs)
+    # loads (or compiles) the step kernel now, instead of in the first episode
+    _worker_env.reset()
+    _worker_env.step(Actions.HOLD.value)
+
+
+def _run_episode(policy):
+    observation = _worker_env.reset()
+    done = False
+    while not done:
+        observation, _, done, _ = _worker_env.step(policy(observation))
+    return dict(
+        total_reward=_worker_env._total_reward,
+        total_profit=_worker_env._total_profit,
+        pid=os.getpid(),
+    )
+
+
+def parallel_rollouts(handle, window_size, policy, n_episodes, n_workers=None, **env_kwargs):
+    """Play ``n_episodes`` with ``policy`` (an importable ``observation -> action`` callable) over a process pool.
+
+    Every worker attaches to the shared block once and builds one CryptoEnv from it, ``env_kwargs`` are passed
+    to CryptoEnv. Workers take one step when they start, so the kernel is loaded before the first episode.
+    Returns the total reward and profit of every episode.
+    """
+    # forking after the parallel episode kernel ran hangs, numba's threading layer is not fork safe
+    with ProcessPoolExecutor(
+        n_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(handle, window_size, env_kwargs),
+    ) as pool:
+        return list(pool.map(_run_episode, [policy] * n_episodes))
@@ -0,0 +1,49 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from gym_crypto.dataset import CandleDataset
+
+
+class ReplayFeed:
+    """Replays stored candles as if they arrived live, to run ``CryptoEnv.append_candles`` offline.
+
+    ``source`` is a DataFrame, a CSV file, a ``CandleDataset`` or its directory. ``history`` returns the candles
+    before ``start`` to build the env from, iterating yields the candles from ``start`` on, ``batch_size`` at a
+    time, as mappings of column arrays. ``interval`` seconds are waited between batches::
+
+        feed = ReplayFeed('data/btc-1m.csv', start=10_000)
+        env = CryptoEnv(feed.history(), window_size=10)
+        observation = env.reset()
+        for candles in feed:
+            env.append_candles(candles)
+            observation, reward, done, info = env.step(agent(observation))
+    """
+
+    def __init__(self, source, start=0, batch_size=1, interval=0.0):
+        if isinstance(source, (str, os.PathLike)):
+            source = CandleDataset(source) if os.path.isdir(source) else pd.read_csv(source)
+        self._columns = {column: np.asarray(source[column]) for column in source.columns}
+        self._length = len(source)
+        self.start = start
+        self.batch_size = batch_size
+        self.interval = interval
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        """Number of batches."""
+        return -(-max(self._length - self.start, 0) // self.batch_size)
+
+    def history(self):
+        return pd.DataFrame({column: values[: self.start] for column, values in self._columns.items()})
+
+    def __iter__(self):
+        for first in range(self.start, self._length, self.batch_size):
+            if self.interval and first > self.start:
+                time.sleep(self.interval)
+            yield {column: values[first : first + self.batch_size] for column, values in self._columns.items()}
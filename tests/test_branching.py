@@ -0,0 +1,81 @@
+"""Branching an episode with get_state/set_state, clone and pickling gives the same results as stepping straight."""
+import copy
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.envs import CryptoEnv
+
+WINDOW_SIZE = 10
+
+
+def make_env(record='full'):
+    prices = 100 + np.cumsum(np.random.default_rng(0).normal(size=400))
+    return CryptoEnv(pd.DataFrame({'Close': prices}), WINDOW_SIZE, record=record)
+
+
+def play(env, actions):
+    return [env.step(action)[1] for action in actions]
+
+
+def play_straight(*paths, record='full'):
+    # a new env stepped through ``paths`` from reset, and the rewards of the last one
+    env = make_env(record)
+    env.reset()
+    for actions in paths:
+        rewards = play(env, actions)
+    return env, rewards
+
+
+def assert_same_episode(env, rewards, expected_env, expected_rewards):
+    np.testing.assert_array_equal(rewards, expected_rewards)
+    assert env.get_state() == expected_env.get_state()
+    pd.testing.assert_frame_equal(env.history, expected_env.history)
+
+
+def test_branch_twice_from_one_snapshot():
+    rng = np.random.default_rng(1)
+    prefix, branch_a, branch_b = (rng.integers(0, 3, 120) for _ in range(3))
+    straight_a, straight_a_rewards = play_straight(prefix, branch_a)
+    straight_b, straight_b_rewards = play_straight(prefix, branch_b)
+
+    env = make_env()
+    env.reset()
+    play(env, prefix)
+    state = env.get_state()
+    prefix_history = env.history.copy()
+    clone = env.clone()
+
+    assert_same_episode(env, play(env, branch_a), straight_a, straight_a_rewards)
+
+    # the recorder is rewound to the snapshot
+    env.set_state(state)
+    pd.testing.assert_frame_equal(env.history, prefix_history)
+    assert_same_episode(env, play(env, branch_b), straight_b, straight_b_rewards)
+
+    env.set_state(state)
+    assert_same_episode(env, play(env, branch_a), straight_a, straight_a_rewards)
+
+    # the clone was not changed by the branches of env
+    pd.testing.assert_frame_equal(clone.history, prefix_history)
+    assert_same_episode(clone, play(clone, branch_b), straight_b, straight_b_rewards)
+    assert_same_episode(env, [], straight_a, [])
+
+
+@pytest.mark.parametrize('record', ['full', 'summary', 'off'])
+@pytest.mark.parametrize('copy_env', [lambda env: pickle.loads(pickle.dumps(env)), copy.deepcopy])
+def test_pickled_env_continues_the_episode(record, copy_env):
+    rng = np.random.default_rng(2)
+    prefix, actions = rng.integers(0, 3, 150), rng.integers(0, 3, 150)
+    expected, expected_rewards = play_straight(prefix, actions, record=record)
+
+    env = make_env(record)
+    env.reset()
+    play(env, prefix)
+    copied = copy_env(env)
+    pd.testing.assert_frame_equal(copied.history, env.history)
+
+    assert_same_episode(copied, play(copied, actions), expected, expected_rewards)
+    assert_same_episode(env, play(env, actions), expected, expected_rewards)
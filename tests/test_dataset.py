@@ -0,0 +1,60 @@
+"""CandleDataset storage and its feature/price index cache."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.dataset import CandleDataset
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.features import FeaturePipeline
+
+WINDOW_SIZE = 10
+
+
+def make_df(n_ticks, seed=0, scale=100):
+    rng = np.random.default_rng(seed)
+    close = scale * np.exp(np.cumsum(rng.normal(scale=0.01, size=n_ticks)))
+    return pd.DataFrame(
+        {
+            'Date': pd.date_range('2021-01-01', periods=n_ticks, freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+        }
+    )
+
+
+def assert_same_env(env, expected):
+    np.testing.assert_array_equal(env.prices, expected.prices)
+    np.testing.assert_array_equal(env.signal_features, expected.signal_features)
+    np.testing.assert_array_equal(env._price_index.values, expected._price_index.values)
+    actions = np.random.default_rng(0).integers(0, 3, expected._end_tick - expected._start_tick)
+    np.testing.assert_array_equal(env.evaluate(actions)['rewards'], expected.evaluate(actions)['rewards'])
+
+
+def test_write_csv_with_date_column(tmp_path):
+    make_df(300).to_csv(tmp_path / 'candles.csv', index=False)
+    df = pd.read_csv(tmp_path / 'candles.csv')
+
+    dataset = CandleDataset.write(tmp_path / 'candles', df)
+    assert dataset['Date'].dtype.kind == 'M'
+    np.testing.assert_array_equal(dataset['Date'], pd.to_datetime(df['Date']).to_numpy())
+
+    features = FeaturePipeline([('CLOSE', {}), ('ATR', {'timeperiod': 14})])
+    for pipeline in (None, features):
+        expected = CryptoEnv(df, WINDOW_SIZE, features=pipeline)
+        assert_same_env(CryptoEnv(CandleDataset(tmp_path / 'candles'), WINDOW_SIZE, features=pipeline), expected)
+
+
+def test_write_rejects_text_columns(tmp_path):
+    df = make_df(50).assign(Symbol='BTC')
+    with pytest.raises(ValueError, match='Symbol'):
+        CandleDataset.write(tmp_path / 'candles', df)
+
+
+@pytest.mark.parametrize('n_ticks', [300, 200])
+def test_rewrite_does_not_use_the_old_cache(tmp_path, n_ticks):
+    CryptoEnv(CandleDataset.write(tmp_path, make_df(300)), WINDOW_SIZE)
+
+    df = make_df(n_ticks, seed=1, scale=1000)
+    env = CryptoEnv(CandleDataset.write(tmp_path, df), WINDOW_SIZE)
+    assert_same_env(env, CryptoEnv(df, WINDOW_SIZE))
@@ -0,0 +1,186 @@
+"""The compiled step, ``evaluate`` and VecCryptoEnv give the same results as the original Python step."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.envs import CryptoEnv, VecCryptoEnv
+from gym_crypto.envs.CryptoEnv import Actions, Positions
+
+WINDOW_SIZE = 10
+N_TICKS = 300
+
+
+def make_df(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=N_TICKS)))})
+
+
+def random_actions(seed, n):
+    return np.random.default_rng(seed).integers(0, len(Actions), n)
+
+
+class ReferenceEpisode:
+    """The step and Algorithm1 rewards of CryptoEnv before they were compiled, as plain Python.
+
+    Differs from it only at the end of the data, where the original read past the last price: the look ahead
+    range is cut off at the last price and the HOLD reward of the last tick treats the next price as unchanged.
+    """
+
+    def __init__(self, env):
+        self.prices = env.prices
+        self.end_tick = env._end_tick
+        self.look_ahead_range = env._look_ahead_range
+        self.profitable_sell_threshold = env._profitable_sell_threshold
+        self.profitable_sell_reward = env._profitable_sell_reward
+        self.non_profitable_sell_punishment = env._non_profitable_sell_punishment
+        self.fee_bid = env.trade_fee_bid_percent
+        self.fee_ask = env.trade_fee_ask_percent
+
+        self.current_tick = env._start_tick
+        self.last_buy_tick = self.last_sell_tick = env._start_tick - 1
+        self.position = Positions.NO.value
+        self.total_reward = 0.0
+        self.total_profit = 1.0
+
+    def _extrema(self, start, current_price):
+        temp_min_price = temp_max_price = current_price
+        for tick in range(start, min(self.current_tick + self.look_ahead_range, len(self.prices))):
+            price = self.prices[tick]
+            if price > current_price and price > temp_max_price:
+                temp_max_price = price
+            if price < current_price and price < temp_min_price:
+                temp_min_price = price
+        return temp_min_price, temp_max_price
+
+    def reward(self, action):
+        step_reward = 0
+        current_price = self.prices[self.current_tick]
+        last_buy_price = self.prices[self.last_buy_tick]
+        last_sell_price = self.prices[self.last_sell_tick]
+
+        if action == Actions.BUY.value:
+            if self.position == Positions.NO.value:
+                temp_min_price, temp_max_price = self._extrema(self.last_sell_tick, current_price)
+                if current_price > temp_min_price:
+                    step_reward += ((temp_min_price - current_price) / current_price) * 100
+                if current_price < temp_max_price:
+                    step_reward += ((temp_max_price - current_price) / current_price) * 100
+            else:
+                step_reward += ((last_buy_price - current_price) / current_price) * 100
+
+        elif action == Actions.SELL.value:
+            if self.position == Positions.YES.value:
+                if last_buy_price * (1 + (self.profitable_sell_threshold / 100)) >= current_price:
+                    step_reward += self.profitable_sell_reward
+                else:
+                    step_reward += self.non_profitable_sell_punishment
+                temp_min_price, temp_max_price = self._extrema(self.last_buy_tick, current_price)
+                if current_price < temp_max_price:
+                    step_reward += ((current_price - temp_max_price) / temp_max_price) * 100
+                if current_price > temp_min_price:
+                    step_reward += ((current_price - temp_min_price) / temp_min_price) * 100
+            else:
+                step_reward += ((current_price - last_sell_price) / last_sell_price) * 100
+
+        else:
+            previous_price = self.prices[self.current_tick - 1]
+            next_price = self.prices[min(self.current_tick + 1, len(self.prices) - 1)]
+            if previous_price <= current_price and next_price >= current_price:
+                step_reward += ((next_price - previous_price) / previous_price) * 100
+            elif previous_price >= current_price and next_price <= current_price:
+                step_reward += ((previous_price - next_price) / next_price) * 100
+
+        return step_reward
+
+    def step(self, action):
+        self.current_tick += 1
+        done = self.current_tick == self.end_tick
+
+        step_reward = self.reward(action)
+        self.total_reward += step_reward
+
+        if self.position == Positions.YES.value and done:
+            shares = (self.total_profit * (1 - self.fee_ask)) / self.prices[self.last_buy_tick]
+            self.total_profit = (shares * (1 - self.fee_bid)) * self.prices[self.current_tick]
+
+        if (action == Actions.BUY.value and self.position == Positions.NO.value) or (
+            action == Actions.SELL.value and self.position == Positions.YES.value
+        ):
+            self.position = 1 - self.position
+            if action == Actions.BUY.value:
+                self.last_buy_tick = self.current_tick
+            else:
+                self.last_sell_tick = self.current_tick
+
+        return step_reward, done
+
+
+def play(env, actions):
+    env.reset()
+    steps = []
+    for action in actions:
+        _, reward, done, info = env.step(int(action))
+        steps.append((reward, info['total_reward'], info['total_profit'], info['position'], done))
+    return steps
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_step_matches_reference(seed):
+    env = CryptoEnv(make_df(seed), WINDOW_SIZE)
+    actions = random_actions(seed, env._end_tick - env._start_tick)
+
+    steps = play(env, actions)
+    reference = ReferenceEpisode(env)
+    for action, (reward, total_reward, total_profit, position, done) in zip(actions, steps):
+        expected_reward, expected_done = reference.step(int(action))
+        assert reward == expected_reward
+        assert total_reward == reference.total_reward
+        assert total_profit == reference.total_profit
+        assert position == reference.position
+        assert done == expected_done
+    assert done
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_evaluate_matches_step(seed):
+    env = CryptoEnv(make_df(seed), WINDOW_SIZE)
+    actions = np.stack([random_actions(seed + i, env._end_tick - env._start_tick) for i in range(3)])
+
+    batch = env.evaluate(actions)
+    for i, episode_actions in enumerate(actions):
+        steps = play(env, episode_actions)
+        result = env.evaluate(episode_actions)
+        for evaluated in (result, {key: values[i] for key, values in batch.items()}):
+            np.testing.assert_array_equal(evaluated['rewards'], [step[0] for step in steps])
+            np.testing.assert_array_equal(evaluated['positions'], [step[3] for step in steps])
+            assert evaluated['total_reward'] == steps[-1][1]
+            assert evaluated['total_profit'] == steps[-1][2]
+        trades = np.flatnonzero(np.diff([Positions.NO.value] + [step[3] for step in steps]))
+        np.testing.assert_array_equal(result['trade_ticks'], env._start_tick + 1 + trades)
+
+
+def test_vector_matches_single_envs():
+    num_envs = 4
+    df = make_df(0)
+    vector = VecCryptoEnv(df, WINDOW_SIZE, num_envs)
+    envs = [CryptoEnv(df, WINDOW_SIZE) for _ in range(num_envs)]
+    # more steps than an episode, so every env is also reset automatically
+    n_steps = vector._end_tick - vector._start_tick + 50
+    actions = np.stack([random_actions(i, n_steps) for i in range(num_envs)], axis=1)
+
+    observation = vector.reset()
+    for i, env in enumerate(envs):
+        np.testing.assert_array_equal(observation[i], env.reset())
+    for step_actions in actions:
+        observation, reward, done, info = vector.step(step_actions)
+        for i, env in enumerate(envs):
+            env_observation, env_reward, env_done, env_info = env.step(int(step_actions[i]))
+            assert reward[i] == env_reward
+            assert done[i] == env_done
+            assert info['total_reward'][i] == env_info['total_reward']
+            assert info['total_profit'][i] == env_info['total_profit']
+            assert info['position'][i] == env_info['position']
+            if env_done:
+                np.testing.assert_array_equal(info['final_observation'][i], env_observation)
+                env_observation = env.reset()
+            np.testing.assert_array_equal(observation[i], env_observation)
@@ -0,0 +1,42 @@
+"""FeaturePipeline normalization only looks at past rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.features import FeaturePipeline
+
+SPECS = [('CLOSE', {}), ('DIFF', {}), ('RSI', {'timeperiod': 14}), ('MACD', {})]
+
+
+def make_df(n_ticks, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=n_ticks)))})
+
+
+@pytest.mark.parametrize('normalize', ['zscore', 'minmax'])
+@pytest.mark.parametrize('normalize_window', [None, 50])
+def test_normalize_does_not_look_ahead(normalize, normalize_window):
+    df = make_df(400)
+    pipeline = FeaturePipeline(SPECS, normalize=normalize, normalize_window=normalize_window)
+    features = pipeline.transform(df)
+
+    # later candles, however different, do not change the features of earlier ones
+    changed = df.copy()
+    changed.loc[300:, 'Close'] *= 10
+    np.testing.assert_array_equal(pipeline.transform(changed)[:300], features[:300])
+    np.testing.assert_array_equal(pipeline.transform(df[:300])[:300], features[:300])
+
+    if normalize == 'minmax':
+        assert features.min() >= 0 and features.max() <= 1
+
+
+def test_normalize_window_matches_recomputing_the_window():
+    df = make_df(200)
+    raw = FeaturePipeline(SPECS).transform(df)
+    features = FeaturePipeline(SPECS, normalize='zscore', normalize_window=30).transform(df)
+    # rows whose window is past the indicator warm up, where no column has a missing value
+    for row in [80, 120, 199]:
+        window = raw[row - 29 : row + 1].astype(np.float64)
+        std = window.std(axis=0)
+        expected = (raw[row] - window.mean(axis=0)) / np.where(std > 0, std, 1)
+        np.testing.assert_allclose(features[row], expected, rtol=1e-4, atol=1e-4)
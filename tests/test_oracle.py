@@ -0,0 +1,63 @@
+"""max_possible_profit/oracle_trades against a brute force search over every trade sequence."""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.kernels import max_profit_fees_kernel, max_profit_kernel
+
+
+def trade(prices, buy_ticks, sell_ticks, fee_bid, fee_ask):
+    # the profit of CryptoEnv for buying at ``buy_ticks`` and selling at ``sell_ticks``, starting from 1
+    cash = 1.0
+    for buy_tick, sell_tick in zip(buy_ticks, sell_ticks):
+        shares = (cash * (1 - fee_ask)) / prices[buy_tick]
+        cash = (shares * (1 - fee_bid)) * prices[sell_tick]
+    return cash
+
+
+def brute_force(prices, start_tick, end_tick, fee_bid, fee_ask):
+    # best profit over every choice of holding or not after each tick, holding nothing after the last one
+    ticks = range(start_tick - 1, end_tick + 1)
+    best = 0.0
+    for holding in itertools.product([False, True], repeat=len(ticks) - 1):
+        holding = list(holding) + [False]
+        buys = [tick for i, tick in enumerate(ticks) if holding[i] and not (i and holding[i - 1])]
+        sells = [tick for i, tick in enumerate(ticks) if i and holding[i - 1] and not holding[i]]
+        best = max(best, trade(prices, buys, sells, fee_bid, fee_ask))
+    return best
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('fees', [(0.0, 0.0), (0.001, 0.002), (0.075, 0.075)])
+def test_oracle_kernels_are_optimal(seed, fees):
+    rng = np.random.default_rng(seed)
+    # rounded so equal consecutive prices occur
+    prices = np.round(100 + np.cumsum(rng.normal(scale=2, size=14)))
+    start_tick, end_tick = 2, 13
+
+    profit, buy_ticks, sell_ticks = max_profit_fees_kernel(prices, start_tick, end_tick, *fees)
+    assert profit == pytest.approx(brute_force(prices, start_tick, end_tick, *fees), rel=1e-12)
+    assert np.all(buy_ticks < sell_ticks)
+    assert np.all(sell_ticks[:-1] <= buy_ticks[1:])
+    assert profit == pytest.approx(trade(prices, buy_ticks, sell_ticks, *fees), rel=1e-12)
+
+    if fees == (0.0, 0.0):
+        profit, buy_ticks, sell_ticks = max_profit_kernel(prices, start_tick, end_tick)
+        assert profit == pytest.approx(brute_force(prices, start_tick, end_tick, *fees), rel=1e-12)
+        assert profit == pytest.approx(trade(prices, buy_ticks, sell_ticks, *fees), rel=1e-12)
+
+
+def test_oracle_trades_cache_is_read_only():
+    prices = 100 + np.cumsum(np.random.default_rng(0).normal(size=200))
+    env = CryptoEnv(pd.DataFrame({'Close': prices}), 10)
+    for fees in (False, True):
+        profit, buy_ticks, sell_ticks = env.oracle_trades(fees=fees)
+        with pytest.raises(ValueError):
+            buy_ticks[0] = 0
+        with pytest.raises(ValueError):
+            sell_ticks[0] = 0
+        assert env.oracle_trades(fees=fees)[1] is buy_ticks
+        assert env.max_possible_profit(fees=fees) == profit
@@ -0,0 +1,55 @@
+"""RangeIndex grown with append against a brute force min/max."""
+import numpy as np
+import pytest
+
+from gym_crypto.range_index import RangeIndex
+
+
+def assert_extrema(index, values, rng, n_queries=300):
+    np.testing.assert_array_equal(index.values, values)
+    start = rng.integers(0, len(values), n_queries)
+    end = start + 1 + rng.integers(0, len(values) - start)
+    expected_min = [values[a:b].min() for a, b in zip(start, end)]
+    expected_max = [values[a:b].max() for a, b in zip(start, end)]
+    range_min, range_max = index.extrema_many(start, end)
+    np.testing.assert_array_equal(range_min, expected_min)
+    np.testing.assert_array_equal(range_max, expected_max)
+    for a, b, low, high in zip(start[:20], end[:20], expected_min, expected_max):
+        assert index.extrema(a, b) == (low, high)
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('block_size', [1, 4, 64])
+def test_append_matches_brute_force(seed, block_size):
+    rng = np.random.default_rng(seed)
+    # rounded so equal values occur
+    values = np.round(rng.normal(size=rng.integers(1, 50)), 1)
+    index = RangeIndex(values, block_size, capacity=rng.choice([None, 2 * len(values)]))
+
+    grown = in_place = 0
+    for _ in range(40):
+        new = np.round(rng.normal(size=rng.integers(0, 3 * block_size + 5)), 1)
+        data = index.data
+        index.append(new)
+        values = np.concatenate([values, new])
+        if index.data is data:
+            in_place += len(new) > 0
+        else:
+            grown += 1
+        assert_extrema(index, values, rng)
+
+    # both the in place update and the rebuild into a larger array were checked
+    assert grown and in_place
+
+
+def test_append_to_read_only_data_copies():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100)
+    index = RangeIndex(values, 8, capacity=400)
+    index.data.flags.writeable = False
+    data = index.data.copy()
+
+    new = rng.normal(size=10)
+    index.append(new)
+    np.testing.assert_array_equal(RangeIndex.from_data(data).values, values)
+    assert_extrema(index, np.concatenate([values, new]), rng)
@@ -0,0 +1,61 @@
+"""Markers added frame by frame by render are the ones a first render of the same state draws."""
+import numpy as np
+import pandas as pd
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.rendering import ACTION_COLORS, decimate_markers
+
+WINDOW_SIZE = 10
+
+
+def make_env(n_ticks=5000):
+    prices = 100 + np.cumsum(np.random.default_rng(0).normal(size=n_ticks))
+    return CryptoEnv(pd.DataFrame({'Close': prices}), WINDOW_SIZE)
+
+
+def markers(env):
+    return {action: list(zip(*env._renderer._markers[action])) for action in ACTION_COLORS}
+
+
+def rendered_once(env):
+    clone = env.clone()
+    clone.render('rgb_array')
+    return markers(clone)
+
+
+def test_markers_match_a_first_render():
+    env = make_env()
+    env.reset()
+    actions = np.random.default_rng(1).integers(0, 3, 600)
+    for action in actions[:300]:
+        env.step(action)
+        frame = env.render('rgb_array')
+    assert frame.shape == (500, 1000, 3) and frame.dtype == np.uint8
+    state = env.get_state()
+    assert markers(env) == rendered_once(env)
+
+    # every few steps, and after going back to a snapshot the other path's markers are gone
+    for action in actions[300:]:
+        env.step(action)
+        if env._current_tick % 7 == 0:
+            env.render('rgb_array')
+    env.render('rgb_array')
+    assert markers(env) == rendered_once(env)
+    env.set_state(state)
+    env.render('rgb_array')
+    assert markers(env) == rendered_once(env)
+
+
+def test_decimate_markers_keeps_one_per_action_and_column():
+    rng = np.random.default_rng(2)
+    ticks = np.sort(rng.choice(10_000, 3000, replace=False))
+    actions = rng.integers(0, 3, len(ticks))
+    keep = decimate_markers(ticks, actions, 50)
+
+    assert np.all(np.diff(keep) > 0)
+    kept = set(zip((ticks[keep] // 50).tolist(), actions[keep].tolist()))
+    assert len(kept) == len(keep) == len(set(zip((ticks // 50).tolist(), actions.tolist())))
+    # the first marker of each column and action
+    for tick, action in zip(ticks[keep], actions[keep]):
+        same = (ticks // 50 == tick // 50) & (actions == action)
+        assert tick == ticks[same].min()
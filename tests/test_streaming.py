@@ -0,0 +1,97 @@
+"""Candles replayed with append_candles give the same env as building it from all of them."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from gym_crypto.envs import CryptoEnv
+from gym_crypto.features import FeaturePipeline
+from gym_crypto.stream import ReplayFeed
+
+WINDOW_SIZE = 10
+N_TICKS = 2400
+START = 1500
+
+PIPELINES = {
+    'default': None,
+    'talib': FeaturePipeline([('CLOSE', {}), ('RSI', {'timeperiod': 14}), ('MACD', {}), ('ATR', {'timeperiod': 14})]),
+    'normalized': FeaturePipeline([('DIFF', {}), ('EMA', {'timeperiod': 20})], normalize='zscore', normalize_window=50),
+}
+
+
+def make_df(n_ticks=N_TICKS, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=n_ticks)))
+    return pd.DataFrame({'High': close * 1.01, 'Low': close * 0.99, 'Close': close})
+
+
+def assert_same_env(env, expected):
+    np.testing.assert_array_equal(env.prices, expected.prices)
+    # stream_context rows are enough for the smoothed indicators to reach the same float32 values
+    np.testing.assert_array_equal(env.signal_features, expected.signal_features)
+    assert env._end_tick == expected._end_tick
+    actions = np.random.default_rng(1).integers(0, 3, expected._end_tick - expected._start_tick)
+    np.testing.assert_array_equal(env.evaluate(actions)['rewards'], expected.evaluate(actions)['rewards'])
+
+
+@pytest.mark.parametrize('pipeline', PIPELINES.values(), ids=PIPELINES.keys())
+@pytest.mark.parametrize('batch_size', [1, 7, 1000])
+def test_replay_matches_the_full_data(pipeline, batch_size):
+    df = make_df()
+    feed = ReplayFeed(df, start=START, batch_size=batch_size)
+    env = CryptoEnv(feed.history(), WINDOW_SIZE, features=pipeline)
+    for candles in feed:
+        env.append_candles(candles)
+
+    assert len(feed) == -(-(N_TICKS - START) // batch_size)
+    assert_same_env(env, CryptoEnv(df, WINDOW_SIZE, features=pipeline))
+
+
+def test_episode_steps_into_appended_candles():
+    df = make_df()
+    feed = ReplayFeed(df, start=START, batch_size=50)
+    env = CryptoEnv(feed.history(), WINDOW_SIZE)
+    observation = env.reset()
+    done = False
+    for candles in feed:
+        env.append_candles(candles)
+        for _ in range(50):
+            observation, _, done, _ = env.step(1)
+
+    expected = CryptoEnv(df, WINDOW_SIZE)
+    expected.reset()
+    for _ in range(N_TICKS - START):
+        expected_observation, _, expected_done, _ = expected.step(1)
+    np.testing.assert_array_equal(observation, expected_observation)
+    assert env._current_tick == expected._current_tick
+    assert not done and not expected_done
+
+
+def test_clone_appends_its_own_candles():
+    df = make_df()
+    other = make_df(seed=1)
+    env = CryptoEnv(df[:START], WINDOW_SIZE)
+    env.append_candles(df[START:2000])
+    clone = env.clone()
+
+    # the clone continues from the candles its parent appended before, then both go their own way
+    clone.append_candles(other[2000:])
+    env.append_candles(df[2000:])
+    assert_same_env(env, CryptoEnv(df, WINDOW_SIZE))
+    assert_same_env(clone, CryptoEnv(pd.concat([df[:2000], other[2000:]]), WINDOW_SIZE))
+
+
+def test_empty_append_leaves_the_env_unchanged():
+    df = make_df()
+    env = CryptoEnv(df, WINDOW_SIZE)
+    prices = env.prices
+    env.append_candles(df[:0])
+    assert env.prices is prices and env._stream is None
+
+    with pytest.raises(KeyError):
+        env.append_candles(df[['High']][:1])
+
+
+def test_normalize_without_window_can_not_be_streamed():
+    env = CryptoEnv(make_df(), WINDOW_SIZE, features=FeaturePipeline([('CLOSE', {})], normalize='minmax'))
+    with pytest.raises(ValueError, match='normalize_window'):
+        env.append_candles(make_df(5))